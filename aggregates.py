@@ -0,0 +1,225 @@
+import weakref
+import pandas as pd
+from preprocessor import MONTH_NAMES, MONTH_DTYPE, DAY_NAMES, PERIOD_LABELS, media_mask
+from textstats import TextStats
+
+# Count cubes stored by ChatIndex.to_tables, each flattened to key columns plus 'count'
+CUBES = ('daily', 'monthly', 'week_hours')
+
+
+class ChatIndex:
+    """
+    Per-user aggregate cubes computed once from a processed chat DataFrame
+
+    Every cube is a count Series indexed by ``user`` plus its own keys, so a
+    panel for one user is a single index lookup and "Overall" is a sum over
+    the user level instead of a rescan of the messages.
+
+    Attributes:
+        daily (pd.Series): Messages per (user, only_date)
+        monthly (pd.Series): Messages per (user, year, month_num)
+        week_hours (pd.Series): Messages per (user, day_of_week, hour)
+        totals (pd.DataFrame): Per-user messages, words, media and links
+        text (TextStats): Word, emoji and link counts from the text pass
+    """
+
+    def __init__(self, daily, monthly, week_hours, totals, text):
+        self.daily = daily
+        self.monthly = monthly
+        self.week_hours = week_hours
+        self.totals = totals
+        self.text = text
+
+    @classmethod
+    def from_frame(cls, df, link_mode='fast'):
+        """
+        Build the index with one grouped pass per cube
+
+        Args:
+            df (pd.DataFrame): Output of preprocess_whatsapp_chat
+            link_mode (str): Link counting mode passed to TextStats
+
+        Returns:
+            ChatIndex: Aggregates for every user in the chat
+        """
+        text = TextStats.from_frame(df, link_mode=link_mode)
+        totals = pd.DataFrame({
+            'messages': df.groupby('user', observed=True).size(),
+            'media': media_mask(df).groupby(df['user'], observed=True).sum(),
+        })
+        totals['words'] = pd.Series(text.words)
+        totals['links'] = pd.Series(text.links)
+        totals = totals[['messages', 'words', 'media', 'links']].astype('int64')
+
+        return cls(
+            daily=df.groupby(['user', 'only_date'], observed=True).size(),
+            monthly=df.groupby(['user', 'year', 'month_num'], observed=True).size(),
+            week_hours=df.groupby(['user', 'day_of_week', 'hour'], observed=True).size(),
+            totals=totals,
+            text=text,
+        )
+
+    def to_tables(self):
+        """
+        Flatten the cubes, totals and text counts into DataFrames for storage
+
+        Returns:
+            dict: Table name -> DataFrame, restored by from_tables
+        """
+        tables = {name: getattr(self, name).rename('count').reset_index() for name in CUBES}
+        tables['totals'] = self.totals.reset_index()
+        tables.update(self.text.to_tables())
+        return tables
+
+    @classmethod
+    def from_tables(cls, tables):
+        """
+        Rebuild an index from the output of to_tables without touching the messages
+        """
+        cubes = {}
+        for name in CUBES:
+            table = tables[name]
+            cubes[name] = table.set_index(table.columns[:-1].tolist())['count'].rename(None)
+        return cls(totals=tables['totals'].set_index('user'), text=TextStats.from_tables(tables), **cubes)
+
+    def merge(self, other):
+        """
+        Combine with the index of messages that follow this chat
+
+        Counts are added key by key, so the result matches an index built
+        from the concatenated messages without rescanning the older ones.
+
+        Args:
+            other (ChatIndex): Index of the appended messages
+
+        Returns:
+            ChatIndex: Aggregates for the combined chat
+        """
+        return ChatIndex.combine([self, other])
+
+    @classmethod
+    def combine(cls, indexes):
+        """
+        Add up the indexes of several chats (or parts of one) in a single pass
+
+        Users with the same name are treated as the same person.
+
+        Args:
+            indexes (list): ChatIndex objects, in message order
+
+        Returns:
+            ChatIndex: Aggregates for all of their messages together
+        """
+        def combine(tables, keys):
+            table = pd.concat(tables, ignore_index=True)
+            # The indexes carry different user categories, which concat widens to strings
+            table['user'] = table['user'].astype(str).astype('category')
+            return table.groupby(keys, sort=True, observed=True).sum()
+
+        cubes = {}
+        for name in CUBES:
+            tables = [getattr(index, name).rename('count').reset_index() for index in indexes]
+            cubes[name] = combine(tables, tables[0].columns[:-1].tolist())['count'].rename(None)
+        totals = combine([index.totals.reset_index() for index in indexes], ['user'])
+        text = TextStats.combine([index.text for index in indexes])
+        return cls(totals=totals.astype('int64'), text=text, **cubes)
+
+    @property
+    def users(self):
+        return self.totals.index.tolist()
+
+    def _select(self, cube, selected_user):
+        """
+        Slice a cube for one user, or sum it over all users for "Overall"
+        """
+        keys = cube.index.names[1:]
+        if selected_user == 'Overall':
+            return cube.groupby(level=keys).sum()
+        if selected_user not in cube.index.get_level_values('user'):
+            return cube.iloc[:0].droplevel('user')
+        return cube.xs(selected_user, level='user')
+
+    def fetch_stats(self, selected_user):
+        if selected_user == 'Overall':
+            row = self.totals.sum()
+        elif selected_user in self.totals.index:
+            row = self.totals.loc[selected_user]
+        else:
+            return 0, 0, 0, 0
+        return int(row['messages']), int(row['words']), int(row['media']), int(row['links'])
+
+    def most_busy_users(self):
+        user_counts = self.totals['messages'].sort_values(ascending=False, kind='stable')
+        user_counts.index.name = 'user'
+        user_counts.name = 'count'
+        df_percent = round((user_counts / user_counts.sum()) * 100, 2).reset_index()
+        df_percent.columns = ['name', 'percent']
+        return user_counts.head(), df_percent
+
+    def monthly_timeline(self, selected_user):
+        timeline = self._select(self.monthly, selected_user).rename('message').reset_index()
+        timeline.insert(2, 'month', pd.Categorical.from_codes(
+            timeline['month_num'].to_numpy() - 1, dtype=MONTH_DTYPE
+        ))
+        timeline['time'] = timeline['month'].astype(str) + "-" + timeline['year'].astype(str)
+        return timeline
+
+    def daily_timeline(self, selected_user):
+        return self._select(self.daily, selected_user).rename('message').reset_index()
+
+    def week_activity_map(self, selected_user):
+        by_day = self._select(self.week_hours, selected_user).groupby(level='day_of_week').sum()
+        by_day.index = pd.Index([DAY_NAMES[day] for day in by_day.index], name='day_name')
+        return by_day.rename('count').sort_values(ascending=False, kind='stable')
+
+    def month_activity_map(self, selected_user):
+        by_month = self._select(self.monthly, selected_user).groupby(level='month_num').sum()
+        by_month.index = pd.Index([MONTH_NAMES[month - 1] for month in by_month.index], name='month')
+        return by_month.rename('count').sort_values(ascending=False, kind='stable')
+
+    def activity_heatmap(self, selected_user):
+        heatmap = self._select(self.week_hours, selected_user).unstack('hour', fill_value=0)
+        heatmap = heatmap.sort_index(axis=1).astype(float)
+        heatmap.index = pd.Index([DAY_NAMES[day] for day in heatmap.index], name='day_name')
+        heatmap.columns = pd.Index([PERIOD_LABELS[hour] for hour in heatmap.columns], name='period')
+        return heatmap
+
+    def most_active_hour(self, selected_user):
+        by_hour = self._select(self.week_hours, selected_user).groupby(level='hour').sum()
+        return by_hour.rename('count').sort_values(ascending=False, kind='stable').head(1)
+
+
+_indexes = {}
+
+
+def get_chat_index(df):
+    """
+    Return the ChatIndex for a processed chat, building it on first use
+
+    Indexes are cached per DataFrame object and released with it, so every
+    helper call on the same parsed chat shares one set of cubes.
+
+    Args:
+        df (pd.DataFrame): Output of preprocess_whatsapp_chat
+
+    Returns:
+        ChatIndex: Aggregates for the chat
+    """
+    key = id(df)
+    entry = _indexes.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    return set_chat_index(df, ChatIndex.from_frame(df))
+
+
+def set_chat_index(df, index):
+    """
+    Register a prebuilt ChatIndex (e.g. loaded from the chat store) for ``df``
+
+    Returns:
+        ChatIndex: ``index``
+    """
+    key = id(df)
+    _indexes[key] = (weakref.ref(df), index)
+    weakref.finalize(df, _indexes.pop, key, None)
+    return index
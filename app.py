@@ -1,11 +1,21 @@
 import streamlit as st
 from preprocessor import preprocess_whatsapp_chat
-from helper import fetch_stats, most_busy_users, create_wordcloud, most_common_words, emoji_helper, monthly_timeline, daily_timeline, week_activity_map, month_activity_map, activity_heatmap
+from helper import fetch_stats, most_busy_users, render_wordcloud_png, most_common_words, emoji_helper, monthly_timeline, daily_timeline, week_activity_map, month_activity_map, activity_heatmap
+from helper import get_response_time_stats, response_time_histogram, response_time_pairs, response_time_by_user, conversation_starters
 import pandas as pd
 import matplotlib.pyplot as plt
-import seaborn as sns
-import warnings
 import numpy as np
+import os
+import functools
+from cache import ParseCache, content_hash
+from store import ChatStore
+from profiling import Profiler
+from aggregates import get_chat_index
+from multichat import ALL_CHATS, MultiChat, parse_exports
+from archive import is_chat_archive, preprocess_chat_archive, media_summary
+import charts
+import interactive_charts
+from timeline import adaptive_timeline
 
 
 
@@ -349,14 +359,535 @@ st.markdown("""
 
 
 
-# Suppress matplotlib font warnings
-warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
+@st.cache_resource
+def get_parse_cache():
+    """
+    Process-wide cache of parsed chats, shared across reruns and sessions
+    """
+    max_mb = int(os.environ.get("CHATSIGHT_CACHE_MB", "1024"))
+    return ParseCache(max_bytes=max_mb * 1024 * 1024)
 
-# Set matplotlib styles for emoji support
-plt.rcParams['font.family'] = 'DejaVu Sans'
-sns.set_style("whitegrid")
-sns.set_palette("husl")
 
+@st.cache_resource
+def get_chat_store():
+    """
+    On-disk store of processed chats shared by every worker on this host
+
+    It keeps the text of uploaded chats on the server, so it is opt-in:
+    None unless CHATSIGHT_STORE_DIR names its directory, or when pyarrow
+    is missing. CHATSIGHT_STORE_MB caps its size on disk.
+    """
+    root = os.environ.get("CHATSIGHT_STORE_DIR")
+    if not root:
+        return None
+    max_mb = int(os.environ.get("CHATSIGHT_STORE_MB", "2048"))
+    try:
+        return ChatStore(root, max_bytes=max_mb * 1024 * 1024)
+    except (ImportError, OSError):
+        return None
+
+
+def get_profiler():
+    """
+    Per-session profiler of pipeline stages, shown in the performance panel
+
+    Memory tracking follows the panel's toggle, or CHATSIGHT_TRACE_MEMORY=1
+    until the toggle is used.
+    """
+    if 'profiler' not in st.session_state:
+        st.session_state['profiler'] = Profiler(trace_memory=os.environ.get("CHATSIGHT_TRACE_MEMORY") == "1")
+    profiler = st.session_state['profiler']
+    if 'trace_memory' in st.session_state:
+        profiler.trace_memory = st.session_state['trace_memory']
+    return profiler
+
+
+def identify_upload(uploaded_file):
+    """
+    Content hash and zip flag of an upload, worked out once per uploaded file
+
+    Hashing a large export takes most of a second and every widget change
+    reruns the script, so the result is kept in the session under the
+    upload's file_id.
+
+    Returns:
+        tuple: (content hash of the upload, True for a zip archive)
+    """
+    uploads = st.session_state.setdefault('uploads', {})
+    if uploaded_file.file_id not in uploads:
+        data = uploaded_file.getbuffer()
+        uploads[uploaded_file.file_id] = (content_hash(data), is_chat_archive(data))
+    return uploads[uploaded_file.file_id]
+
+
+def load_chat(uploaded_file):
+    """
+    Parse an uploaded chat, reusing the cached DataFrame for identical uploads
+
+    Lookups go to the in-memory cache first, then the on-disk chat store,
+    which also recognizes a newer export of a stored chat and parses only
+    the added messages, and only then to the parser.
+
+    Returns:
+        tuple: (content hash of the upload, processed DataFrame)
+    """
+    profiler = get_profiler()
+    data = uploaded_file.getbuffer()
+    key, zipped = identify_upload(uploaded_file)
+    context = {'bytes': len(data), 'source': 'memory', 'archive': zipped}
+
+    def parse():
+        context['source'] = 'parse'
+        # Stream the upload (or the chat inside an exported .zip) through the
+        # parser instead of decoding it in one go
+        uploaded_file.seek(0)
+        if zipped:
+            df = profiler.call('preprocess_chat_archive', preprocess_chat_archive, uploaded_file, rows=len)
+        else:
+            df = profiler.call('preprocess_whatsapp_chat', preprocess_whatsapp_chat, uploaded_file, rows=len)
+        # Build the per-user aggregates once; every panel reads from them
+        if not df.empty:
+            profiler.call('get_chat_index', get_chat_index, df, rows=len(df))
+        return df
+
+    def from_store():
+        context['source'] = 'store'
+        # Newer exports are only recognized from their raw text, not from a zip
+        return store.get_or_parse(key, parse, None if zipped else data)
+
+    with profiler.stage('load_chat', **context) as record:
+        store = get_chat_store()
+        df = get_parse_cache().get_or_parse(key, from_store if store is not None else parse)
+        record.update(context, rows=len(df), encoding=df.attrs.get('encoding'))
+    return key, df
+
+
+def load_chats(uploaded_files):
+    """
+    Parse several uploads for multi-chat mode
+
+    Uploads already in the parse cache or the chat store are loaded from
+    there; the rest are parsed concurrently in worker processes and then
+    cached and stored like single uploads.
+
+    Returns:
+        tuple: (key identifying the set of uploads, MultiChat)
+    """
+    profiler = get_profiler()
+    cache, store = get_parse_cache(), get_chat_store()
+    keys, chats, missing = {}, {}, {}
+    for uploaded_file in uploaded_files:
+        # Chats are named after their files; repeated names get a counter
+        name = os.path.splitext(uploaded_file.name)[0]
+        chat_id, copy = name, 1
+        while chat_id in keys:
+            copy += 1
+            chat_id = f"{name} ({copy})"
+        data = uploaded_file.getbuffer()
+        keys[chat_id] = identify_upload(uploaded_file)[0]
+        df = cache.get(keys[chat_id])
+        if df is None and store is not None:
+            df = store.load(keys[chat_id])
+            if df is not None:
+                cache.put(keys[chat_id], df)
+        if df is None:
+            missing[chat_id] = data
+        else:
+            chats[chat_id] = df
+
+    if missing:
+        with profiler.stage('parse_exports', chats=len(missing),
+                            bytes=sum(len(data) for data in missing.values())) as record:
+            parsed = parse_exports(missing)
+            record['rows'] = sum(len(df) for df in parsed.values())
+        for chat_id, df in parsed.items():
+            cache.put(keys[chat_id], df)
+            if store is not None:
+                store.save(keys[chat_id], df, missing[chat_id])
+        chats.update(parsed)
+
+    multi_key = content_hash(' '.join(f"{chat_id}={key}" for chat_id, key in keys.items()).encode())
+    return multi_key, get_multi_chat(multi_key, {chat_id: chats[chat_id] for chat_id in keys})
+
+
+@st.cache_resource(max_entries=8)
+def get_multi_chat(multi_key, _chats):
+    """
+    One MultiChat per set of uploads, so the combined table and index are built once
+    """
+    return MultiChat(_chats)
+
+
+@st.cache_data(max_entries=32, show_spinner=False)
+def archive_media(chat_key, _data):
+    """
+    Media files of an uploaded export archive by type, read from its index only
+    """
+    return media_summary(_data)
+
+
+# Helper behind each dashboard section
+SECTION_DATA = {
+    'stats': fetch_stats,
+    'monthly_timeline': monthly_timeline,
+    'daily_timeline': daily_timeline,
+    'week_activity': week_activity_map,
+    'month_activity': month_activity_map,
+    'heatmap': activity_heatmap,
+    'busy_users': most_busy_users,
+    'common_words': most_common_words,
+    'emojis': emoji_helper,
+    'response_time': get_response_time_stats,
+    'response_histogram': response_time_histogram,
+    'response_pairs': response_time_pairs,
+    'response_by_user': response_time_by_user,
+    'starters': conversation_starters,
+}
+
+# Sections computed for the whole chat whatever user is selected
+CHAT_SECTIONS = {'busy_users', 'response_by_user', 'starters'}
+
+
+@st.cache_data(max_entries=512, show_spinner=False)
+def section_data(chat_key, selected_user, section, _df):
+    """
+    Compute one section's data, cached per (chat, user, section)
+
+    The DataFrame itself is not hashed; ``chat_key`` (the upload's content
+    hash) identifies it. Only cache misses reach the profiler.
+    """
+    func = SECTION_DATA[section]
+    args = (_df,) if section in CHAT_SECTIONS else (selected_user, _df)
+    return get_profiler().call(f'helper.{func.__name__}', func, *args,
+                               rows=len(_df), context={'user': selected_user})
+
+
+@st.cache_data(max_entries=128, show_spinner=False)
+def wordcloud_image(chat_key, selected_user, settings, _df):
+    """
+    Rendered word cloud PNG, cached per (chat, user, settings)
+
+    ``settings`` is a tuple of (option, value) pairs so it can be hashed.
+    """
+    return get_profiler().call('helper.render_wordcloud_png', render_wordcloud_png, selected_user, _df,
+                               rows=len(_df), context={'user': selected_user}, **dict(settings))
+
+
+CHART_BACKENDS = {"⚡ Interactive": 'plotly', "🖼️ Static images": 'matplotlib'}
+
+
+def show_chart(name, *args):
+    """
+    Draw one of the figures shared by charts.py and interactive_charts.py
+    with the backend picked in the sidebar
+
+    Plotly charts ship a small JSON spec the browser draws; matplotlib
+    renders a PNG on the server.
+    """
+    if st.session_state.get('chart_backend', 'plotly') == 'plotly':
+        st.plotly_chart(getattr(interactive_charts, name)(*args), width='stretch')
+    else:
+        fig = getattr(charts, name)(*args)
+        st.pyplot(fig)
+        plt.close(fig)
+
+
+def render_performance(profiler):
+    """
+    Collapsible panel with the stage timings of this session and a JSON export
+    """
+    with st.expander("⏱️ Performance"):
+        st.toggle("Track peak memory (slower)", key='trace_memory', value=profiler.trace_memory)
+        summary = profiler.summary()
+        if summary.empty:
+            st.info("No stages recorded yet.")
+        else:
+            st.caption("Per stage totals for this session; cached results are not re-timed.")
+            st.dataframe(summary, width='stretch')
+            st.caption("Most recent stages")
+            st.dataframe(profiler.to_frame().tail(30).iloc[::-1], width='stretch', hide_index=True)
+        st.download_button(
+            "📥 Download metrics (JSON)", profiler.to_json(),
+            file_name="chatsight-metrics.json", mime="application/json",
+        )
+
+
+def render_stats(chat_key, selected_user, df):
+    """
+    Key statistics cards; always rendered, it only reads precomputed totals
+    """
+    num_messages, num_words, num_media_messages, num_links = section_data(chat_key, selected_user, 'stats', df)
+
+    st.markdown('<h2 class="section-title">📈 Key Statistics</h2>', unsafe_allow_html=True)
+    col1, col2, col3, col4 = st.columns(4)
+
+    with col1:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3 style="font-size: 2.5rem; margin: 0;">💬</h3>
+            <h4 style="margin: 0.5rem 0; font-size: 1rem;">Total Messages</h4>
+            <h2 style="margin: 0; font-size: 2rem;">{num_messages:,}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col2:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3 style="font-size: 2.5rem; margin: 0;">📝</h3>
+            <h4 style="margin: 0.5rem 0; font-size: 1rem;">Total Words</h4>
+            <h2 style="margin: 0; font-size: 2rem;">{num_words:,}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col3:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3 style="font-size: 2.5rem; margin: 0;">📷</h3>
+            <h4 style="margin: 0.5rem 0; font-size: 1rem;">Media Shared</h4>
+            <h2 style="margin: 0; font-size: 2rem;">{num_media_messages:,}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+    with col4:
+        st.markdown(f"""
+        <div class="metric-card">
+            <h3 style="font-size: 2.5rem; margin: 0;">🔗</h3>
+            <h4 style="margin: 0.5rem 0; font-size: 1rem;">Links Shared</h4>
+            <h2 style="margin: 0; font-size: 2rem;">{num_links:,}</h2>
+        </div>
+        """, unsafe_allow_html=True)
+
+
+# Timeline resolutions offered next to the chart; Auto fits the date range
+# to the plot width (roughly half of a wide page)
+TIMELINE_RESOLUTIONS = {"Auto": None, "Daily": 'D', "Weekly": 'W-MON', "Monthly": 'MS'}
+TIMELINE_WIDTH_PX = 700
+
+
+def render_timelines(chat_key, selected_user, df):
+    """
+    Monthly and daily message timelines
+    """
+    st.markdown('<h2 class="section-title">📅 Timeline Analysis</h2>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("📊 Monthly Timeline")
+        timeline_data = section_data(chat_key, selected_user, 'monthly_timeline', df)
+        show_chart('monthly_timeline_chart', timeline_data)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("📈 Daily Timeline")
+        daily_data = section_data(chat_key, selected_user, 'daily_timeline', df)
+        choice = st.selectbox("Resolution", list(TIMELINE_RESOLUTIONS), key='timeline_resolution')
+        timeline_data, resolution = adaptive_timeline(
+            daily_data, TIMELINE_WIDTH_PX, rule=TIMELINE_RESOLUTIONS[choice]
+        )
+        st.caption(f"{resolution.capitalize()} totals · {len(timeline_data):,} points "
+                   f"from {len(daily_data):,} active days")
+        show_chart('daily_timeline_chart', timeline_data)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_activity(chat_key, selected_user, df):
+    """
+    Busiest days and months plus the weekly heatmap
+    """
+    st.markdown('<h2 class="section-title">🗓️ Activity Patterns</h2>', unsafe_allow_html=True)
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("📅 Most Busy Day")
+        busy_day = section_data(chat_key, selected_user, 'week_activity', df)
+        show_chart('activity_bar_chart', busy_day, charts.PRIMARY_COLOR)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("📆 Most Busy Month")
+        busy_month = section_data(chat_key, selected_user, 'month_activity', df)
+        show_chart('activity_bar_chart', busy_month, charts.SECONDARY_COLOR)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    # Heatmap
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    st.subheader("🔥 Weekly Activity Heatmap")
+    user_heatmap = section_data(chat_key, selected_user, 'heatmap', df)
+    show_chart('activity_heatmap_chart', user_heatmap)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_busy_users(chat_key, selected_user, df):
+    """
+    Most active users of the group
+    """
+    st.markdown('<h2 class="section-title">👥 Most Active Users</h2>', unsafe_allow_html=True)
+    x, new_df = section_data(chat_key, 'Overall', 'busy_users', df)
+
+    col1, col2 = st.columns([2, 1])
+
+    with col1:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        show_chart('busy_users_chart', x)
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.dataframe(new_df, width='stretch')
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_wordcloud(chat_key, selected_user, df):
+    """
+    Word cloud of the most frequent words
+    """
+    st.markdown('<h2 class="section-title">☁️ Word Cloud</h2>', unsafe_allow_html=True)
+    col1, col2 = st.columns(2)
+    with col1:
+        colormap = st.selectbox("🎨 Colour scheme", ['viridis', 'plasma', 'magma', 'cividis', 'cool', 'Set2'])
+    with col2:
+        max_words = st.slider("🔢 Words shown", min_value=20, max_value=300, value=100, step=20)
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    settings = (('colormap', colormap), ('max_words', max_words))
+    image = wordcloud_image(chat_key, selected_user, settings, df)
+    if image is not None:
+        st.image(image, width='stretch')
+    else:
+        st.info("📭 No words to show for the selected conversation.")
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_common_words(chat_key, selected_user, df):
+    """
+    Bar chart of the most common words
+    """
+    st.markdown('<h2 class="section-title">🔤 Most Common Words</h2>', unsafe_allow_html=True)
+    st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+    most_common_df = section_data(chat_key, selected_user, 'common_words', df)
+    show_chart('common_words_chart', most_common_df)
+    st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_emojis(chat_key, selected_user, df):
+    """
+    Emoji table and pie chart of the top emojis
+    """
+    st.markdown('<h2 class="section-title">😊 Emoji Analysis</h2>', unsafe_allow_html=True)
+    emoji_df = section_data(chat_key, selected_user, 'emojis', df)
+
+    if not emoji_df.empty:
+        col1, col2 = st.columns([1, 2])
+
+        with col1:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            st.dataframe(emoji_df, width='stretch')
+            st.markdown('</div>', unsafe_allow_html=True)
+
+        with col2:
+            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+            show_chart('emoji_pie_chart', emoji_df)
+            st.markdown('</div>', unsafe_allow_html=True)
+    else:
+        st.info("📭 No emojis found in the selected conversation.")
+
+
+def format_duration(value):
+    """
+    Short label for a Timedelta: '45s', '4m 30s' or '2h 05m'
+    """
+    if value is None or pd.isna(value):
+        return "–"
+    seconds = int(value.total_seconds())
+    if seconds < 60:
+        return f"{seconds}s"
+    if seconds < 3600:
+        return f"{seconds // 60}m {seconds % 60:02d}s"
+    return f"{seconds // 3600}h {seconds % 3600 // 60:02d}m"
+
+
+def render_response_times(chat_key, selected_user, df):
+    """
+    Reply latency cards, histogram and per-user or per-partner table
+    """
+    st.markdown('<h2 class="section-title">⏳ Response Times</h2>', unsafe_allow_html=True)
+    stats = section_data(chat_key, selected_user, 'response_time', df)
+    if stats is None:
+        st.info("📭 No replies found in the selected conversation.")
+        return
+
+    cards = [
+        ("↩️", "Replies", f"{stats['replies']:,}"),
+        ("⏱️", "Median Reply Time", format_duration(stats['median'])),
+        ("🐢", "90% Reply Within", format_duration(stats['p90'])),
+    ]
+    for col, (icon, label, value) in zip(st.columns(len(cards)), cards):
+        with col:
+            st.markdown(f"""
+            <div class="metric-card">
+                <h3 style="font-size: 2.5rem; margin: 0;">{icon}</h3>
+                <h4 style="margin: 0.5rem 0; font-size: 1rem;">{label}</h4>
+                <h2 style="margin: 0; font-size: 2rem;">{value}</h2>
+            </div>
+            """, unsafe_allow_html=True)
+    st.caption("A reply is a message answering someone else's within the same conversation; "
+               "six hours of silence start a new conversation.")
+
+    col1, col2 = st.columns(2)
+
+    with col1:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        st.subheader("📊 Reply Time Distribution")
+        show_chart('response_time_chart', section_data(chat_key, selected_user, 'response_histogram', df))
+        st.markdown('</div>', unsafe_allow_html=True)
+
+    with col2:
+        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
+        if selected_user == 'Overall':
+            st.subheader("👥 Reply Times by User")
+            table = section_data(chat_key, selected_user, 'response_by_user', df).copy()
+            starters = section_data(chat_key, selected_user, 'starters', df)
+            table['conversations started'] = starters.reindex(table.index, fill_value=0)
+        else:
+            st.subheader("🤝 Reply Times by Partner")
+            table = section_data(chat_key, selected_user, 'response_pairs', df).droplevel('user')
+        for column in ('median', 'p90', 'mean'):
+            table[column] = table[column].map(format_duration)
+        st.dataframe(table, width='stretch')
+        st.markdown('</div>', unsafe_allow_html=True)
+
+
+def render_decoding_warnings(chats):
+    """
+    Flag uploads in which some bytes could not be decoded and were replaced
+    """
+    for name, df in chats.items():
+        replaced = df.attrs.get('replacements', 0)
+        if replaced:
+            st.sidebar.warning(
+                f"⚠️ {name}: {replaced:,} unreadable characters were replaced while decoding "
+                f"({df.attrs.get('encoding')}); words and emoji counts may be slightly off."
+            )
+
+
+def render_chats(multi, chat_key, selected_user, df):
+    """
+    Side-by-side summary of every uploaded chat and who writes in which
+    """
+    st.markdown('<h2 class="section-title">🧩 Chat Comparison</h2>', unsafe_allow_html=True)
+    st.dataframe(multi.summary(), width='stretch')
+
+    st.subheader("👥 Participants Across Chats")
+    user_chats = multi.user_chats()
+    if selected_user != 'Overall':
+        user_chats = user_chats[user_chats.index == selected_user]
+    st.caption("Messages per chat; people are matched by their display name.")
+    st.dataframe(user_chats, width='stretch')
 
 
 # Sidebar
@@ -365,12 +896,16 @@ st.sidebar.markdown("---")
 
 
 
-uploaded_file = st.sidebar.file_uploader("📁 Upload Chat File", type=['txt'])
+uploaded_files = st.sidebar.file_uploader(
+    "📁 Upload Chat File", type=['txt', 'zip'], accept_multiple_files=True,
+    help="The exported .txt, or the .zip WhatsApp creates when exporting with media. "
+         "Upload several exports at once to compare chats",
+)
 
 
 
 # Welcome screen when no file is uploaded
-if uploaded_file is None:
+if not uploaded_files:
     # Hero Section with Image
     st.markdown("""
     <div class="hero-section">
@@ -423,7 +958,7 @@ if uploaded_file is None:
             <li>Tap on the <strong>three dots (⋮)</strong> menu at the top right corner</li>
             <li>Select <strong>More</strong> and then <strong>Export chat</strong></li>
             <li>Choose <strong>Without media</strong> option to export only text messages</li>
-            <li>Upload the exported <strong>.txt file</strong> using the sidebar uploader above 👆</li>
+            <li>Upload the exported <strong>.txt file</strong> using the sidebar uploader above 👆 (or several to compare chats)</li>
             <li>Select a user or choose <strong>Overall</strong> for complete analysis</li>
             <li>Click <strong>Show Analysis</strong> button and enjoy your insights! 🎉</li>
         </ol>
@@ -440,13 +975,21 @@ if uploaded_file is None:
     """, unsafe_allow_html=True)
     
 else:
-    bytes_data = uploaded_file.getvalue()
-    data = bytes_data.decode("utf-8")
-    df = preprocess_whatsapp_chat(data)
+    multi = None
+    if len(uploaded_files) == 1:
+        chat_key, df = load_chat(uploaded_files[0])
+        analysis_key = chat_key
+    else:
+        analysis_key, multi = load_chats(uploaded_files)
+        chat_choice = st.sidebar.selectbox("💬 Chat", [ALL_CHATS] + multi.chat_ids)
+        df = multi.select(chat_choice) if multi.chats else pd.DataFrame()
+        chat_key = f"{analysis_key}/{chat_choice}"
     
     if df.empty:
         st.error("⚠️ Unable to parse the chat file. Please make sure you've uploaded a valid WhatsApp chat export.")
         st.stop()
+
+    render_decoding_warnings({uploaded_files[0].name: df} if multi is None else multi.chats)
     
     # Fetch unique users
     user_list = df['user'].unique().tolist()
@@ -455,9 +998,22 @@ else:
     user_list.sort()
     user_list.insert(0, "Overall")
     
+
     selected_user = st.sidebar.selectbox("👤 Show analysis for", user_list)
-    
+
+    default_backend = 'matplotlib' if os.environ.get("CHATSIGHT_CHART_BACKEND") == 'matplotlib' else 'plotly'
+    backend_label = st.sidebar.radio(
+        "📊 Chart style", list(CHART_BACKENDS),
+        index=list(CHART_BACKENDS.values()).index(default_backend),
+        help="Interactive charts are drawn in the browser and load faster; static images match the PNG exports",
+    )
+    st.session_state['chart_backend'] = CHART_BACKENDS[backend_label]
+
+    # Remember the click so reruns triggered by switching tabs keep the results open
     if st.sidebar.button("🔍 Show Analysis"):
+        st.session_state['analysis_for'] = analysis_key
+
+    if st.session_state.get('analysis_for') == analysis_key:
         # Main header
         st.markdown("""
         <div class="hero-section">
@@ -466,242 +1022,52 @@ else:
             <p>Detailed insights from your WhatsApp conversation</p>
         </div>
         """, unsafe_allow_html=True)
-        
-        # Stats Area
-        num_messages, num_words, num_media_messages, num_links = fetch_stats(selected_user, df)
-        
-        st.markdown('<h2 class="section-title">📈 Key Statistics</h2>', unsafe_allow_html=True)
-        col1, col2, col3, col4 = st.columns(4)
-        
-        with col1:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3 style="font-size: 2.5rem; margin: 0;">💬</h3>
-                <h4 style="margin: 0.5rem 0; font-size: 1rem;">Total Messages</h4>
-                <h2 style="margin: 0; font-size: 2rem;">{num_messages:,}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3 style="font-size: 2.5rem; margin: 0;">📝</h3>
-                <h4 style="margin: 0.5rem 0; font-size: 1rem;">Total Words</h4>
-                <h2 style="margin: 0; font-size: 2rem;">{num_words:,}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col3:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3 style="font-size: 2.5rem; margin: 0;">📷</h3>
-                <h4 style="margin: 0.5rem 0; font-size: 1rem;">Media Shared</h4>
-                <h2 style="margin: 0; font-size: 2rem;">{num_media_messages:,}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        with col4:
-            st.markdown(f"""
-            <div class="metric-card">
-                <h3 style="font-size: 2.5rem; margin: 0;">🔗</h3>
-                <h4 style="margin: 0.5rem 0; font-size: 1rem;">Links Shared</h4>
-                <h2 style="margin: 0; font-size: 2rem;">{num_links:,}</h2>
-            </div>
-            """, unsafe_allow_html=True)
-        
-        # Timelines
-        st.markdown('<h2 class="section-title">📅 Timeline Analysis</h2>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.subheader("📊 Monthly Timeline")
-            timeline_data = monthly_timeline(selected_user, df)
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.plot(timeline_data['time'], timeline_data['message'], color='#667eea', linewidth=2.5, marker='o')
-            ax.fill_between(timeline_data['time'], timeline_data['message'], alpha=0.3, color='#667eea')
-            plt.xticks(rotation=45, ha='right')
-            ax.set_xlabel('Time Period', fontsize=12, fontweight='bold')
-            ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.subheader("📈 Daily Timeline")
-            daily_data = daily_timeline(selected_user, df)
-            fig, ax = plt.subplots(figsize=(10, 5))
-            ax.plot(daily_data['only_date'], daily_data['message'], color='#764ba2', linewidth=2, alpha=0.8)
-            plt.xticks(rotation=45, ha='right')
-            ax.set_xlabel('Date', fontsize=12, fontweight='bold')
-            ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
-            ax.grid(True, alpha=0.3)
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Activity Map
-        st.markdown('<h2 class="section-title">🗓️ Activity Patterns</h2>', unsafe_allow_html=True)
-        
-        col1, col2 = st.columns(2)
-        
-        with col1:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.subheader("📅 Most Busy Day")
-            busy_day = week_activity_map(selected_user, df)
-            fig, ax = plt.subplots(figsize=(8, 5))
-            bars = ax.bar(busy_day.index, busy_day.values, color='#667eea', edgecolor='white', linewidth=2)
-            plt.xticks(rotation=45, ha='right')
-            ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
-            ax.grid(axis='y', alpha=0.3)
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with col2:
-            st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-            st.subheader("📆 Most Busy Month")
-            busy_month = month_activity_map(selected_user, df)
-            fig, ax = plt.subplots(figsize=(8, 5))
-            bars = ax.bar(busy_month.index, busy_month.values, color='#764ba2', edgecolor='white', linewidth=2)
-            plt.xticks(rotation=45, ha='right')
-            ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
-            ax.grid(axis='y', alpha=0.3)
-            plt.tight_layout()
-            st.pyplot(fig)
-            plt.close()
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Heatmap
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        st.subheader("🔥 Weekly Activity Heatmap")
-        user_heatmap = activity_heatmap(selected_user, df)
-        fig, ax = plt.subplots(figsize=(14, 6))
-        sns.heatmap(user_heatmap, cmap='RdYlGn', linewidths=0.5, linecolor='white', 
-                    cbar_kws={'label': 'Message Count'}, annot=False)
-        plt.xlabel('Time Period', fontsize=12, fontweight='bold')
-        plt.ylabel('Day of Week', fontsize=12, fontweight='bold')
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Most Busy Users (Group level)
+
+        profiler = get_profiler()
+
+        # Stats are cheap and render straight away
+        with profiler.stage('render.stats', rows=len(df), user=selected_user):
+            render_stats(chat_key, selected_user, df)
+
+        # Exports made "with media" list their attachments in the zip index
+        if multi is None and identify_upload(uploaded_files[0])[1]:
+            media = archive_media(chat_key, uploaded_files[0].getbuffer())
+            if not media.empty:
+                with st.expander(f"📦 {media['files'].sum():,} media files in the export"):
+                    st.dataframe(media, hide_index=True, width='stretch')
+
+        # Every other section only computes while its tab is open
+        sections = [
+            ("📅 Timelines", render_timelines),
+            ("🗓️ Activity", render_activity),
+            ("☁️ Word Cloud", render_wordcloud),
+            ("🔤 Common Words", render_common_words),
+            ("😊 Emojis", render_emojis),
+            ("⏳ Response Times", render_response_times),
+        ]
         if selected_user == 'Overall':
-            st.markdown('<h2 class="section-title">👥 Most Active Users</h2>', unsafe_allow_html=True)
-            x, new_df = most_busy_users(df)
-            
-            col1, col2 = st.columns([2, 1])
-            
-            with col1:
-                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                fig, ax = plt.subplots(figsize=(10, 6))
-                bars = ax.bar(x.index, x.values, color='#667eea', edgecolor='white', linewidth=2)
-                for i, bar in enumerate(bars):
-                    height = bar.get_height()
-                    ax.text(bar.get_x() + bar.get_width()/2., height,
-                            f'{int(height)}', ha='center', va='bottom', fontweight='bold')
-                plt.xticks(rotation=45, ha='right')
-                ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
-                ax.set_title('Most Active Users', fontsize=14, fontweight='bold', pad=10)
-                ax.grid(axis='y', alpha=0.3)
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                st.dataframe(new_df, width='stretch')
-                st.markdown('</div>', unsafe_allow_html=True)
-        
-        # WordCloud
-        st.markdown('<h2 class="section-title">☁️ Word Cloud</h2>', unsafe_allow_html=True)
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        df_wc = create_wordcloud(selected_user, df)
-        fig, ax = plt.subplots(figsize=(12, 6))
-        ax.imshow(df_wc, interpolation='bilinear')
-        ax.axis('off')
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Most Common Words
-        st.markdown('<h2 class="section-title">🔤 Most Common Words</h2>', unsafe_allow_html=True)
-        st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-        most_common_df = most_common_words(selected_user, df)
-        
-        fig, ax = plt.subplots(figsize=(10, 8))
-        bars = ax.barh(most_common_df[0], most_common_df[1], color='#667eea', edgecolor='white', linewidth=1.5)
-        for i, bar in enumerate(bars):
-            width = bar.get_width()
-            ax.text(width, bar.get_y() + bar.get_height()/2., f' {int(width)}',
-                    ha='left', va='center', fontweight='bold', fontsize=10)
-        ax.set_xlabel('Frequency', fontsize=12, fontweight='bold')
-        ax.set_title('Most Common Words', fontsize=14, fontweight='bold', pad=10)
-        ax.grid(axis='x', alpha=0.3)
-        plt.tight_layout()
-        st.pyplot(fig)
-        plt.close()
-        st.markdown('</div>', unsafe_allow_html=True)
-        
-        # Emoji Analysis
-        st.markdown('<h2 class="section-title">😊 Emoji Analysis</h2>', unsafe_allow_html=True)
-        emoji_df = emoji_helper(selected_user, df)
-        
-        if not emoji_df.empty:
-            col1, col2 = st.columns([1, 2])
-            
-            with col1:
-                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                st.dataframe(emoji_df, width='stretch')
-                st.markdown('</div>', unsafe_allow_html=True)
-            
-            with col2:
-                st.markdown('<div class="chart-container">', unsafe_allow_html=True)
-                fig, ax = plt.subplots(figsize=(8, 8))
-                top_emojis = emoji_df.head(5)
-                sizes = top_emojis[1].values
-                emojis = top_emojis[0].values
-                
-                colors = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b']
-                explode = tuple([0.05] * len(top_emojis))
-                
-                # Create pie chart without labels
-                wedges, texts, autotexts = ax.pie(
-                    sizes, 
-                    autopct="%0.1f%%",
-                    colors=colors, 
-                    startangle=90,
-                    explode=explode,
-                    shadow=True,
-                    textprops={'fontsize': 12, 'weight': 'bold', 'color': 'white'}
-                )
-                
-                # Create custom legend with emojis and counts
-                legend_labels = [f"{emoji}  ({count})" for emoji, count in zip(emojis, sizes)]
-                ax.legend(legend_labels, loc='center left', bbox_to_anchor=(1, 0, 0.5, 1), 
-                         fontsize=14, frameon=True, fancybox=True, shadow=True)
-                
-                ax.set_title('Top 5 Most Used Emojis', fontsize=14, fontweight='bold', pad=20)
-                plt.tight_layout()
-                st.pyplot(fig)
-                plt.close()
-                st.markdown('</div>', unsafe_allow_html=True)
-        else:
-            st.info("📭 No emojis found in the selected conversation.")
-        
+            sections.insert(2, ("👥 Active Users", render_busy_users))
+        if multi is not None:
+            sections.append(("🧩 Chats", functools.update_wrapper(functools.partial(render_chats, multi), render_chats)))
+
+        tabs = st.tabs(
+            [label for label, _ in sections],
+            key=f"analysis_sections_{len(sections)}",
+            on_change="rerun",
+        )
+        for tab, (label, render) in zip(tabs, sections):
+            if tab.open:
+                with tab:
+                    with st.spinner("Crunching numbers..."):
+                        with profiler.stage(f"render.{render.__name__[len('render_'):]}", rows=len(df), user=selected_user):
+                            render(chat_key, selected_user, df)
+
+        render_performance(profiler)
+
         # Footer
         st.markdown("""
         <div class="footer">
             <p style="font-size: 1.2rem;">Built with <span class="love">❤️</span> by <strong>Ayush</strong></p>
             <p style="font-size: 0.9rem; opacity: 0.9;">WhatsApp Chat Analyzer © 2025</p>
         </div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+        """, unsafe_allow_html=True)
@@ -0,0 +1,136 @@
+import io
+import os
+import zipfile
+from contextlib import contextmanager
+import pandas as pd
+from preprocessor import preprocess_whatsapp_chat
+
+# Name of the chat text in iOS exports; Android names it "WhatsApp Chat with <name>.txt"
+IOS_CHAT_MEMBER = '_chat.txt'
+
+# Media type per file extension, for counting the attachments of an export
+MEDIA_TYPES = {
+    **dict.fromkeys(['jpg', 'jpeg', 'png', 'gif', 'heic', 'bmp'], 'image'),
+    **dict.fromkeys(['webp'], 'sticker'),
+    **dict.fromkeys(['mp4', 'mov', '3gp', 'mkv', 'avi', 'webm'], 'video'),
+    **dict.fromkeys(['opus', 'ogg', 'm4a', 'mp3', 'aac', 'amr', 'wav'], 'audio'),
+    **dict.fromkeys(['pdf', 'doc', 'docx', 'xls', 'xlsx', 'ppt', 'pptx', 'txt', 'csv', 'zip', 'apk'], 'document'),
+    **dict.fromkeys(['vcf'], 'contact'),
+}
+
+
+def _as_zip_source(source):
+    """
+    Wrap raw bytes in a file object; paths and file objects are used as they are
+    """
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return io.BytesIO(source)
+    return source
+
+
+def is_chat_archive(source):
+    """
+    Check whether an upload or file is a zip archive rather than chat text
+
+    Args:
+        source: Path, raw bytes or a seekable binary file object; a file
+            object's position is restored afterwards
+
+    Returns:
+        bool: True for zip archives
+    """
+    source = _as_zip_source(source)
+    if isinstance(source, (str, os.PathLike)):
+        return zipfile.is_zipfile(source)
+    position = source.tell()
+    try:
+        return zipfile.is_zipfile(source)
+    finally:
+        source.seek(position)
+
+
+def find_chat_member(archive):
+    """
+    Pick the chat text file of an exported archive from its index
+
+    ``_chat.txt`` is preferred; otherwise the largest top-level .txt file
+    (Android exports hold a single "WhatsApp Chat with ....txt").
+
+    Args:
+        archive (zipfile.ZipFile): Opened export archive
+
+    Returns:
+        zipfile.ZipInfo: The chat member, or None when there is no text file
+    """
+    texts = [info for info in archive.infolist()
+             if not info.is_dir() and info.filename.lower().endswith('.txt')]
+    for info in texts:
+        if os.path.basename(info.filename) == IOS_CHAT_MEMBER:
+            return info
+    top_level = [info for info in texts if '/' not in info.filename.rstrip('/')] or texts
+    return max(top_level, key=lambda info: info.file_size, default=None)
+
+
+@contextmanager
+def open_chat_member(source):
+    """
+    Open the chat text of an exported archive as a binary stream
+
+    Only the chat member is decompressed, as it is read; media members are
+    never touched and nothing is written to disk.
+
+    Args:
+        source: Path, raw bytes or binary file object of the archive
+
+    Yields:
+        file: Readable binary stream of the chat text, or None when the
+        archive holds no text file
+    """
+    with zipfile.ZipFile(_as_zip_source(source)) as archive:
+        member = find_chat_member(archive)
+        if member is None:
+            yield None
+            return
+        with archive.open(member) as stream:
+            yield stream
+
+
+def preprocess_chat_archive(source, **kwargs):
+    """
+    Preprocess the chat inside an exported .zip, streaming it out of the archive
+
+    Args:
+        source: Path, raw bytes or binary file object of the archive
+        **kwargs: Forwarded to preprocess_whatsapp_chat
+
+    Returns:
+        pd.DataFrame: Processed DataFrame, empty when the archive holds no chat
+    """
+    with open_chat_member(source) as stream:
+        if stream is None:
+            return pd.DataFrame()
+        return preprocess_whatsapp_chat(stream, **kwargs)
+
+
+def media_summary(source):
+    """
+    Count the media files of an exported archive by type from its index
+
+    Sizes come from the zip directory, so no media member is read.
+
+    Args:
+        source: Path, raw bytes or binary file object of the archive
+
+    Returns:
+        pd.DataFrame: Columns type, files and mb, one row per media type,
+        most files first; empty for text-only exports
+    """
+    with zipfile.ZipFile(_as_zip_source(source)) as archive:
+        chat = find_chat_member(archive)
+        members = [info for info in archive.infolist() if not info.is_dir() and info is not chat]
+    summary = pd.DataFrame({
+        'type': [MEDIA_TYPES.get(os.path.splitext(info.filename)[1][1:].lower(), 'other') for info in members],
+        'bytes': [info.file_size for info in members],
+    }).groupby('type').agg(files=('bytes', 'size'), mb=('bytes', 'sum'))
+    summary['mb'] = (summary['mb'] / 1e6).round(2)
+    return summary.sort_values('files', ascending=False, kind='stable').reset_index()
@@ -0,0 +1,164 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import helper
+from aggregates import ChatIndex, get_chat_index, set_chat_index
+from textstats import NOTIFICATION_USER
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = feather = None
+
+# Helper outputs computed for every user, keyed by the name used in the result
+USER_SECTIONS = {
+    'stats': helper.fetch_stats,
+    'monthly_timeline': helper.monthly_timeline,
+    'daily_timeline': helper.daily_timeline,
+    'week_activity': helper.week_activity_map,
+    'month_activity': helper.month_activity_map,
+    'heatmap': helper.activity_heatmap,
+    'most_active_hour': helper.get_most_active_hour,
+    'common_words': helper.most_common_words,
+    'emojis': helper.emoji_helper,
+    'message_length': helper.get_message_length_stats,
+    'response_time': helper.get_response_time_stats,
+    'response_histogram': helper.response_time_histogram,
+    'response_pairs': helper.response_time_pairs,
+}
+
+# Users handed to a worker per task; larger chunks mean fewer round trips
+CHUNK_SIZE = 4
+
+# The chat each worker process analyzes, loaded once by the pool initializer
+_worker_df = None
+
+
+def analyze_user(selected_user, df, sections=None):
+    """
+    Compute every helper output for one user
+
+    Args:
+        selected_user (str): User name or 'Overall'
+        df (pd.DataFrame): Processed chat
+        sections (iterable): Names from USER_SECTIONS; all when None
+
+    Returns:
+        dict: Section name -> helper result
+    """
+    if sections is None:
+        sections = USER_SECTIONS
+    return {name: USER_SECTIONS[name](selected_user, df) for name in sections}
+
+
+def _read_arrow(path):
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def _load_shared_frame(directory, tables, attrs):
+    """
+    Pool initializer: load the chat and its index tables written by the parent
+
+    The files are memory-mapped, so Arrow-backed string columns can be read
+    from the shared page cache; to_pandas() still gives each worker its own
+    copy of the numeric, datetime and categorical columns. The aggregate
+    index is rebuilt from its tables instead of repeating the text pass.
+    """
+    global _worker_df
+    _worker_df = _read_arrow(os.path.join(directory, 'chat.arrow'))
+    _worker_df.attrs.update(attrs)
+    set_chat_index(_worker_df, ChatIndex.from_tables({
+        name: _read_arrow(os.path.join(directory, f'{name}.arrow')) for name in tables
+    }))
+
+
+def _set_frame(df, index):
+    """
+    Pool initializer used when pyarrow is unavailable; the frame and its index are pickled once per worker
+    """
+    global _worker_df
+    _worker_df = df
+    set_chat_index(_worker_df, index)
+
+
+def _analyze_chunk(users, sections):
+    return [(user, analyze_user(user, _worker_df, sections)) for user in users]
+
+
+def analyze_all_users(df, users=None, sections=None, workers=None, include_overall=True, progress=None):
+    """
+    Compute the helper outputs for every user of a chat across processes
+
+    The chat and the tables of its aggregate index, built once here, are
+    written to uncompressed Arrow IPC files that each worker memory-maps,
+    instead of pickling the DataFrame into every task; tasks only carry user
+    names.
+
+    Args:
+        df (pd.DataFrame): Output of preprocess_whatsapp_chat
+        users (list): Users to analyze; every participant when None
+        sections (iterable): Names from USER_SECTIONS; all when None
+        workers (int): Worker processes; os.cpu_count() when None, and 1
+            runs everything in this process
+        include_overall (bool): Also compute the 'Overall' report
+        progress (callable): Called as progress(done, total) after each
+            finished user
+
+    Returns:
+        dict: User name -> {section name: helper result}, in input order
+    """
+    if users is None:
+        users = sorted(user for user in df['user'].unique() if user != NOTIFICATION_USER)
+    users = list(users)
+    if include_overall and 'Overall' not in users:
+        users.insert(0, 'Overall')
+    if sections is not None:
+        sections = list(sections)
+        unknown = [name for name in sections if name not in USER_SECTIONS]
+        if unknown:
+            raise ValueError(f"Unknown sections {unknown}; expected names from {list(USER_SECTIONS)}")
+
+    total = len(users)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, total))
+
+    results = {}
+    if workers == 1:
+        for user in users:
+            results[user] = analyze_user(user, df, sections)
+            if progress is not None:
+                progress(len(results), total)
+        return results
+
+    chunks = [users[i:i + CHUNK_SIZE] for i in range(0, total, CHUNK_SIZE)]
+    # The text pass is by far the costliest step; run it once, not per worker
+    index = get_chat_index(df)
+    shared_dir = None
+    try:
+        if pa is not None:
+            shared_dir = tempfile.mkdtemp(prefix='chatsight-')
+            feather.write_feather(df, os.path.join(shared_dir, 'chat.arrow'), compression='uncompressed')
+            tables = index.to_tables()
+            for name, table in tables.items():
+                feather.write_feather(table, os.path.join(shared_dir, f'{name}.arrow'), compression='uncompressed')
+            initializer, initargs = _load_shared_frame, (shared_dir, list(tables), dict(df.attrs))
+        else:
+            initializer, initargs = _set_frame, (df, index)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=initializer, initargs=initargs) as pool:
+            futures = [pool.submit(_analyze_chunk, chunk, sections) for chunk in chunks]
+            for future in as_completed(futures):
+                for user, report in future.result():
+                    results[user] = report
+                    if progress is not None:
+                        progress(len(results), total)
+    finally:
+        if shared_dir is not None:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+    return {user: results[user] for user in users}
@@ -0,0 +1,82 @@
+"""
+Compare the single-pass tokenizer against the original findall/split parser
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parser --messages 1000000
+"""
+import argparse
+import re
+import time
+
+from benchmarks.synthetic import generate_chat
+from preprocessor import detect_header_format, tokenize_chat, SAMPLE_SIZE
+
+
+LEGACY_PATTERNS = [
+    r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2} [ap]m\s-\s',
+    r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s[ap]m\s-\s',
+    r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s-\s',
+]
+
+
+def legacy_tokenize(data):
+    """
+    The original parsing stage: findall + split per pattern, then a per-row sender split
+    """
+    dates, messages = [], []
+    for pattern in LEGACY_PATTERNS:
+        dates = re.findall(pattern, data)
+        if dates:
+            messages = re.split(pattern, data)[1:]
+            break
+    users, messages_clean = [], []
+    for message in messages:
+        entry = re.split(r'([\w\W]+?):\s', message, maxsplit=1)
+        if len(entry) >= 3:
+            users.append(entry[1].strip())
+            messages_clean.append(entry[2].strip())
+        else:
+            users.append('group_notification')
+            messages_clean.append(entry[0].strip())
+    return dates, users, messages_clean
+
+
+def single_pass_tokenize(data):
+    header_format = detect_header_format(data[:SAMPLE_SIZE])
+    return tokenize_chat(data, header_format)
+
+
+def best_of(func, data, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(data)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=1_000_000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    data = generate_chat(args.messages)
+    print(f"{args.messages:,} messages, {len(data) / 1e6:.1f} MB of text")
+
+    # Check both parsers agree before timing them
+    check = generate_chat(10_000, seed=1)
+    legacy, new = legacy_tokenize(check), single_pass_tokenize(check)
+    assert legacy[1] == new[1] and legacy[2] == new[2], "tokenizers disagree"
+
+    legacy_time = best_of(legacy_tokenize, data, args.repeat)
+    new_time = best_of(single_pass_tokenize, data, args.repeat)
+
+    print(f"legacy      : {legacy_time:8.3f} s  ({args.messages / legacy_time:12,.0f} msg/s)")
+    print(f"single-pass : {new_time:8.3f} s  ({args.messages / new_time:12,.0f} msg/s)")
+    print(f"speedup     : {legacy_time / new_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
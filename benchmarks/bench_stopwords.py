@@ -0,0 +1,67 @@
+"""
+Benchmark the stop-word token filter: list membership vs the hashed registry
+
+Run from the repository root:
+
+    python -m benchmarks.bench_stopwords --messages 1000000
+"""
+import argparse
+import time
+from collections import Counter
+
+from benchmarks.synthetic import generate_chat
+from preprocessor import preprocess_whatsapp_chat, media_mask
+from stopwords import get_stop_words, read_stop_words
+from textstats import NOTIFICATION_USER
+
+
+def legacy_filter(messages, stop_words):
+    """
+    The original path: test every token against the stop words held in a Python list
+    """
+    stop_list = list(stop_words)
+    words = []
+    for message in messages:
+        for word in message.lower().split():
+            if word not in stop_list:
+                words.append(word)
+    return Counter(words)
+
+
+def registry_filter(messages, stop_words):
+    """
+    Count all tokens in C, then drop the stop words present among the distinct keys
+    """
+    counts = Counter('\n'.join(messages).lower().split())
+    for word in stop_words & counts.keys():
+        del counts[word]
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    df = preprocess_whatsapp_chat(generate_chat(args.messages))
+    df = df[(df['user'] != NOTIFICATION_USER) & ~media_mask(df)]
+    messages = df['message'].tolist()
+    num_tokens = sum(len(message.split()) for message in messages)
+    print(f"{len(messages):,} messages, {num_tokens:,} tokens")
+
+    start = time.perf_counter()
+    legacy = legacy_filter(messages, read_stop_words('stop_hinglish.txt'))
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new = registry_filter(messages, get_stop_words())
+    new_time = time.perf_counter() - start
+
+    assert legacy == new, "filters disagree"
+    print(f"list filter     : {legacy_time:8.3f} s  ({num_tokens / legacy_time:14,.0f} tokens/s)")
+    print(f"registry filter : {new_time:8.3f} s  ({num_tokens / new_time:14,.0f} tokens/s)")
+    print(f"speedup         : {legacy_time / new_time:8.1f}x")
+
+
+if __name__ == '__main__':
+    main()
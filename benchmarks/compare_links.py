@@ -0,0 +1,86 @@
+"""
+Compare fast regex link counting against URLExtract on a sample corpus
+
+Run from the repository root:
+
+    python -m benchmarks.compare_links --messages 20000
+"""
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from benchmarks.synthetic import generate_chat
+from links import count_links
+from preprocessor import preprocess_whatsapp_chat
+
+
+LINK_SNIPPETS = [
+    'https://www.youtube.com/watch?v=dQw4w9WgXcQ',
+    'http://example.org/path/to/page.html',
+    'www.flipkart.com',
+    'maps.google.co.in/maps?q=delhi',
+    'github.com/Ayush-Raj189/ChatSight-',
+    'bit.ly/3xYz12',
+    'https://docs.python.org/3/library/re.html#module-re',
+    'instagram.com/p/abc123/',
+]
+
+NON_LINK_SNIPPETS = [
+    'e.g.', 'etc.', 'ok...', 'v1.2.3', 'Rs.500', 'mail me at priya@example.com',
+    'file.txt', 'image.jpeg', '10.30 baje', 'hmm.. theek hai',
+]
+
+
+def sample_corpus(num_messages, seed=0):
+    """
+    Synthetic chat messages with links and link-like text mixed in
+    """
+    rng = random.Random(seed)
+    messages = preprocess_whatsapp_chat(generate_chat(num_messages, seed=seed))['message'].tolist()
+    corpus = []
+    for message in messages:
+        roll = rng.random()
+        if roll < 0.05:
+            message = f"{message} {rng.choice(LINK_SNIPPETS)}"
+        elif roll < 0.10:
+            message = f"{rng.choice(LINK_SNIPPETS)} {message} {rng.choice(LINK_SNIPPETS)}"
+        elif roll < 0.20:
+            message = f"{message} {rng.choice(NON_LINK_SNIPPETS)}"
+        corpus.append(message)
+    return pd.Series(corpus)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--messages', type=int, default=20_000)
+    args = parser.parse_args()
+
+    corpus = sample_corpus(args.messages)
+
+    start = time.perf_counter()
+    fast = count_links(corpus, 'fast')
+    fast_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    accurate = count_links(corpus, 'accurate')
+    accurate_time = time.perf_counter() - start
+
+    agree = (fast == accurate).mean() * 100
+    print(f"{len(corpus):,} messages")
+    print(f"links found   : fast {fast.sum():,}, URLExtract {accurate.sum():,}")
+    print(f"per-message agreement: {agree:.2f}%")
+    print(f"fast          : {fast_time:8.3f} s  ({len(corpus) / fast_time:12,.0f} msg/s)")
+    print(f"URLExtract    : {accurate_time:8.3f} s  ({len(corpus) / accurate_time:12,.0f} msg/s)")
+    print(f"speedup       : {accurate_time / fast_time:8.1f}x")
+
+    disagreements = corpus[fast != accurate]
+    if len(disagreements):
+        print("\nsample disagreements:")
+        for message in disagreements.head(10):
+            print(f"  {message!r}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,199 @@
+"""
+Stage-by-stage benchmark of the ingest pipeline and the dashboard helpers
+
+Run from the repository root:
+
+    python -m benchmarks.run --sizes 10k 100k 1M --formats android_12h us_12h
+    python -m benchmarks.run --sizes 1M --output after.json --compare before.json
+
+Synthetic exports are generated once per (format, size) into --data-dir.
+Every stage is timed best-of --repeat; with --memory each stage is run once
+more under tracemalloc to record its peak Python and NumPy allocation
+(buffers allocated by Arrow are not traced). The process peak RSS is
+printed at the end.
+"""
+import argparse
+import json
+import mmap
+import os
+import platform
+import resource
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.synthetic import FORMATS, write_chat
+from preprocessor import (
+    SAMPLE_SIZE, detect_header_format, tokenize_chat, detect_date_format,
+    parse_timestamps, build_chat_frame, add_time_features, iter_text_chunks,
+    preprocess_chat_file,
+)
+from textstats import TextStats
+from aggregates import ChatIndex, get_chat_index
+import helper
+
+SIZE_SUFFIXES = {'k': 1_000, 'M': 1_000_000}
+
+DEFAULT_SIZES = ['10k', '100k', '1M']
+
+# Helpers timed for 'Overall' and for the most active user
+HELPERS = [
+    'fetch_stats', 'monthly_timeline', 'daily_timeline', 'week_activity_map',
+    'month_activity_map', 'activity_heatmap', 'get_most_active_hour',
+    'most_common_words', 'emoji_helper', 'get_message_length_stats',
+    'get_response_time_stats',
+]
+
+
+def parse_size(text):
+    """
+    '10k' -> 10000, '1M' -> 1000000, '2500' -> 2500
+    """
+    if text[-1] in SIZE_SUFFIXES:
+        return int(float(text[:-1]) * SIZE_SUFFIXES[text[-1]])
+    return int(text)
+
+
+def peak_rss_mb():
+    """
+    Peak resident set size of this process so far, in MB
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes elsewhere
+    return peak / 1e6 if sys.platform == 'darwin' else peak / 1e3
+
+
+def measure(func, repeat, memory):
+    """
+    Time ``func`` best-of ``repeat`` and optionally record its tracemalloc peak
+
+    Returns:
+        tuple: (result of the last call, seconds, peak MB or None)
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    peak = None
+    if memory:
+        tracemalloc.start()
+        result = func()
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+    return result, best, peak
+
+
+def read_text(path):
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return ''.join(iter_text_chunks(mapped))
+
+
+def run_case(path, num_messages, repeat, memory):
+    """
+    Time every stage for one synthetic export
+
+    Returns:
+        list: One dict per stage with seconds, messages/s, MB/s and peak MB
+    """
+    size_mb = os.path.getsize(path) / 1e6
+    stages = []
+
+    def record(stage, func):
+        result, seconds, peak = measure(func, repeat, memory)
+        stages.append({
+            'stage': stage,
+            'seconds': round(seconds, 6),
+            'messages_per_s': round(num_messages / seconds) if seconds else None,
+            'mb_per_s': round(size_mb / seconds, 2) if seconds else None,
+            'peak_mb': None if peak is None else round(peak, 2),
+        })
+        return result
+
+    text = record('decode', lambda: read_text(path))
+    header_format = detect_header_format(text[:SAMPLE_SIZE])
+    timestamps, users, messages = record('tokenize', lambda: tokenize_chat(text, header_format))
+    date_format = detect_date_format(timestamps)
+    record('date_parse', lambda: parse_timestamps(timestamps, date_format))
+    base = build_chat_frame(timestamps, users, messages, date_format)[['date', 'user', 'message']]
+    record('features', lambda: add_time_features(base.copy()))
+    record('frame', lambda: build_chat_frame(timestamps, users, messages, date_format))
+    df = record('preprocess_file', lambda: preprocess_chat_file(path))
+    record('text_stats', lambda: TextStats.from_frame(df))
+    record('chat_index', lambda: ChatIndex.from_frame(df))
+
+    get_chat_index(df)
+    top_user = df['user'].value_counts().index[0]
+    for name in HELPERS:
+        func = getattr(helper, name)
+        for selected_user, label in (('Overall', 'overall'), (top_user, 'user')):
+            record(f'{name}[{label}]', lambda: func(selected_user, df))
+    record('most_busy_users', lambda: helper.most_busy_users(df))
+    record('create_wordcloud', lambda: helper.create_wordcloud('Overall', df))
+    return stages
+
+
+def print_case(name, num_messages, size_mb, stages, baseline=None):
+    print(f"\n{name}: {num_messages:,} messages, {size_mb:.1f} MB")
+    header = f"  {'stage':38s} {'seconds':>10s} {'msg/s':>14s} {'MB/s':>9s} {'peak MB':>9s}"
+    if baseline:
+        header += f" {'vs base':>8s}"
+    print(header)
+    for stage in stages:
+        line = (f"  {stage['stage']:38s} {stage['seconds']:10.4f} "
+                f"{stage['messages_per_s'] or 0:14,d} {stage['mb_per_s'] or 0:9.1f} "
+                f"{'' if stage['peak_mb'] is None else format(stage['peak_mb'], '.1f'):>9s}")
+        if baseline and stage['stage'] in baseline and baseline[stage['stage']]:
+            line += f" {stage['seconds'] / baseline[stage['stage']]:7.2f}x"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', nargs='+', default=DEFAULT_SIZES,
+                        help="Message counts, e.g. 10k 100k 1M 10M (default: 10k 100k 1M)")
+    parser.add_argument('--formats', nargs='+', choices=list(FORMATS), default=list(FORMATS))
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--memory', action='store_true', help="Record tracemalloc peaks per stage")
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'chatsight-bench'),
+                        help="Where generated exports are cached")
+    parser.add_argument('--output', help="Write the results as JSON")
+    parser.add_argument('--compare', help="Earlier --output file to show ratios against")
+    args = parser.parse_args()
+
+    baseline = {}
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf-8') as f:
+            for case in json.load(f)['cases']:
+                baseline[case['name']] = {stage['stage']: stage['seconds'] for stage in case['stages']}
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    cases = []
+    for size in args.sizes:
+        num_messages = parse_size(size)
+        for format_name in args.formats:
+            path = os.path.join(args.data_dir, f'{format_name}-{num_messages}.txt')
+            if not os.path.exists(path):
+                write_chat(path, num_messages, **FORMATS[format_name])
+            name = f'{format_name}/{size}'
+            stages = run_case(path, num_messages, args.repeat, args.memory)
+            size_mb = os.path.getsize(path) / 1e6
+            print_case(name, num_messages, size_mb, stages, baseline.get(name))
+            cases.append({'name': name, 'format': format_name, 'messages': num_messages,
+                          'mb': round(size_mb, 2), 'stages': stages})
+
+    print(f"\npeak RSS: {peak_rss_mb():,.0f} MB")
+    if args.output:
+        results = {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'cases': cases,
+        }
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
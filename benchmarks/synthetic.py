@@ -0,0 +1,144 @@
+"""
+Deterministic generator of synthetic WhatsApp chat exports for benchmarks
+"""
+import random
+from datetime import datetime, timedelta
+
+
+USERS = ['Aarav', 'Priya Sharma', 'Rohan', 'Neha K', 'Vikram', '+91 98765 43210']
+
+WORDS = [
+    'haan', 'nahi', 'kal', 'milte', 'hai', 'bhai', 'ok', 'the', 'meeting', 'is',
+    'at', 'office', 'lunch', 'chalo', 'kya', 'scene', 'party', 'tonight', 'done',
+    'thanks', 'photo', 'bhejo', 'abhi', 'aa', 'raha', 'hoon', 'weekend', 'plan',
+]
+
+# Single codepoints, skin-tone modifiers, ZWJ families, flags and keycaps
+EMOJIS = [
+    '😂', '❤️', '👍', '🙏', '😍', '🔥', '😭', '🎉', '👍🏽', '🙏🏻',
+    '👨‍👩‍👧', '👩‍💻', '🏳️‍🌈', '🇮🇳', '🇬🇧', '1️⃣', '#️⃣',
+]
+
+# iOS media placeholders: attachment types left out of the export, or attached files
+IOS_MEDIA = [
+    '\u200eimage omitted', '\u200evideo omitted', '\u200esticker omitted',
+    '\u200e<attached: 00000042-PHOTO-2019-01-01-09-00-00.jpg>',
+]
+
+LINKS = ['https://example.com/watch?v=abc123', 'www.example.org', 'docs.example.in/page']
+
+# Named export variants; every option not listed keeps its generate_chat default
+FORMATS = {
+    'android_12h': {},
+    'android_12h_thin': {'thin_space': True},
+    'android_24h': {'clock': '24h'},
+    'us_12h': {'day_first': False, 'year_digits': 2},
+    'emoji_heavy': {'emoji_rate': 0.6, 'link_rate': 0.05},
+    'ios_24h': {'style': 'ios', 'clock': '24h', 'year_digits': 2},
+    'ios_12h': {'style': 'ios', 'day_first': False, 'year_digits': 2, 'meridiems': ('AM', 'PM')},
+    'dotted_24h': {'clock': '24h', 'date_sep': '.', 'year_digits': 2},
+    'localized_12h': {'meridiems': ('a. m.', 'p. m.')},
+}
+
+
+def _header(current, clock, thin_space, day_first, year_digits, style='android', date_sep='/',
+            meridiems=('am', 'pm')):
+    first, second = (current.day, current.month) if day_first else (current.month, current.day)
+    year = current.year if year_digits == 4 else current.year % 100
+    date = f"{first:02d}{date_sep}{second:02d}{date_sep}{year:02d}, "
+    if style == 'ios':
+        if clock == '24h':
+            return f"[{date}{current.strftime('%H:%M:%S')}] "
+        return f"[{date}{current.strftime('%I:%M:%S').lstrip('0')} {meridiems[current.hour >= 12]}] "
+    if clock == '24h':
+        return f"{date}{current.strftime('%H:%M')} - "
+    separator = ' ' if thin_space else ' '
+    return f"{date}{current.strftime('%I:%M').lstrip('0')}{separator}{meridiems[current.hour >= 12]} - "
+
+
+def iter_chat_lines(num_messages, seed=0, clock='12h', thin_space=False, day_first=True,
+                    year_digits=4, emoji_rate=0.0, link_rate=0.0, style='android', date_sep='/',
+                    meridiems=('am', 'pm')):
+    """
+    Yield the messages of a synthetic export one (possibly multi-line) entry at a time
+
+    Takes the same arguments as generate_chat.
+    """
+    rng = random.Random(seed)
+    current = datetime(2019, 1, 1, 9, 0)
+    for _ in range(num_messages):
+        current += timedelta(minutes=rng.randint(0, 30))
+        header = _header(current, clock, thin_space, day_first, year_digits, style, date_sep, meridiems)
+        roll = rng.random()
+        if roll < 0.02:
+            yield f"{header}{rng.choice(USERS)} added {rng.choice(USERS)}"
+        elif roll < 0.07:
+            # Picked from the roll already drawn, so Android output never changes
+            media = IOS_MEDIA[int(roll * 1000) % len(IOS_MEDIA)] if style == 'ios' else '<Media omitted>'
+            yield f"{header}{rng.choice(USERS)}: {media}"
+        else:
+            text = ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 12)))
+            if roll > 0.95:
+                text += '\n' + ' '.join(rng.choice(WORDS) for _ in range(rng.randint(1, 6)))
+            # Extra draws only happen when enabled, so the default output never changes
+            if emoji_rate and rng.random() < emoji_rate:
+                text += ' ' + ''.join(rng.choice(EMOJIS) for _ in range(rng.randint(1, 4)))
+            if link_rate and rng.random() < link_rate:
+                text += ' ' + rng.choice(LINKS)
+            yield f"{header}{rng.choice(USERS)}: {text}"
+
+
+def generate_chat(num_messages, seed=0, clock='12h', thin_space=False, day_first=True,
+                  year_digits=4, emoji_rate=0.0, link_rate=0.0, style='android', date_sep='/',
+                  meridiems=('am', 'pm')):
+    """
+    Generate an Android or iOS export with ``num_messages`` messages
+
+    About 2% are group notifications, 5% media placeholders (in the style's
+    own wording) and 5% span two lines.
+
+    Args:
+        num_messages (int): Number of message headers to emit
+        seed (int): Random seed, so runs are reproducible
+        clock (str): '12h' ("9:05 am") or '24h' ("09:05") timestamps
+        thin_space (bool): Put U+202F before am/pm, as newer Android exports do
+        day_first (bool): d/m/y dates when True, m/d/y otherwise
+        year_digits (int): 4 or 2 digit years
+        emoji_rate (float): Share of text messages ending in emoji
+        link_rate (float): Share of text messages ending in a link
+        style (str): 'android' ("d/m/y, h:mm am - ") or 'ios'
+            ("[d/m/y, h:mm:ss AM] ") headers
+        date_sep (str): Date separator, e.g. '.' for dotted dates
+        meridiems (tuple): Morning and afternoon markers of 12-hour clocks
+
+    Returns:
+        str: Chat export text
+    """
+    lines = iter_chat_lines(num_messages, seed, clock, thin_space, day_first,
+                            year_digits, emoji_rate, link_rate, style, date_sep, meridiems)
+    return '\n'.join(lines) + '\n'
+
+
+def write_chat(path, num_messages, seed=0, **options):
+    """
+    Write a synthetic export to ``path`` without holding it all in memory
+
+    Args:
+        path (str): Output file
+        num_messages (int): Number of message headers to emit
+        seed (int): Random seed
+        **options: Format options of generate_chat
+
+    Returns:
+        int: Size of the written file in bytes
+    """
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        batch = []
+        for line in iter_chat_lines(num_messages, seed, **options):
+            batch.append(line)
+            if len(batch) == 100_000:
+                f.write('\n'.join(batch) + '\n')
+                batch = []
+        if batch:
+            f.write('\n'.join(batch) + '\n')
+        return f.tell()
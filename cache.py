@@ -0,0 +1,101 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+
+def content_hash(data):
+    """
+    Compute a stable content hash for an uploaded chat export
+
+    Args:
+        data (bytes | memoryview): Raw uploaded bytes
+
+    Returns:
+        str: Hex digest identifying the upload
+    """
+    return hashlib.blake2b(data, digest_size=20).hexdigest()
+
+
+def frame_nbytes(df):
+    """
+    Estimate the in-memory size of a DataFrame including object payloads
+    """
+    return int(df.memory_usage(index=True, deep=True).sum())
+
+
+class ParseCache:
+    """
+    Content-addressed LRU cache of processed chat DataFrames
+
+    Entries are keyed by the hash of the uploaded bytes and evicted in
+    least-recently-used order once the total size exceeds ``max_bytes``.
+    The cache is shared between Streamlit sessions, so all access is
+    guarded by a lock.
+    """
+
+    def __init__(self, max_bytes=1024 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, key):
+        return key in self._entries
+
+    @property
+    def total_bytes(self):
+        return self._total_bytes
+
+    def get(self, key):
+        """
+        Return the cached DataFrame for ``key`` or None, marking it as recently used
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key, df):
+        """
+        Store a DataFrame under ``key`` and evict old entries over budget
+
+        Frames larger than the whole budget are not cached.
+        """
+        size = frame_nbytes(df)
+        with self._lock:
+            if key in self._entries:
+                self._total_bytes -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (df, size)
+            self._total_bytes += size
+            while self._total_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._total_bytes -= evicted_size
+
+    def get_or_parse(self, key, parse):
+        """
+        Return the cached DataFrame for ``key``, calling ``parse()`` on a miss
+
+        Args:
+            key (str): Content hash of the upload
+            parse (callable): Zero-argument function producing the DataFrame
+
+        Returns:
+            pd.DataFrame: Processed chat DataFrame
+        """
+        df = self.get(key)
+        if df is None:
+            df = parse()
+            self.put(key, df)
+        return df
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._total_bytes = 0
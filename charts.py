@@ -0,0 +1,156 @@
+import warnings
+import matplotlib.pyplot as plt
+import seaborn as sns
+
+# Suppress matplotlib font warnings
+warnings.filterwarnings('ignore', category=UserWarning, module='matplotlib')
+warnings.filterwarnings('ignore', message='Glyph .* missing from font', category=UserWarning)
+
+# Set matplotlib styles for emoji support
+plt.rcParams['font.family'] = 'DejaVu Sans'
+sns.set_style("whitegrid")
+sns.set_palette("husl")
+
+PRIMARY_COLOR = '#667eea'
+SECONDARY_COLOR = '#764ba2'
+PIE_COLORS = ['#667eea', '#764ba2', '#f093fb', '#4facfe', '#43e97b']
+
+
+def _rotate_xticks(ax):
+    plt.setp(ax.get_xticklabels(), rotation=45, ha='right')
+
+
+def monthly_timeline_chart(timeline_data):
+    """
+    Line chart of messages per month (output of monthly_timeline)
+    """
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(timeline_data['time'], timeline_data['message'], color=PRIMARY_COLOR, linewidth=2.5, marker='o')
+    ax.fill_between(timeline_data['time'], timeline_data['message'], alpha=0.3, color=PRIMARY_COLOR)
+    _rotate_xticks(ax)
+    ax.set_xlabel('Time Period', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def daily_timeline_chart(daily_data):
+    """
+    Line chart of messages per day (output of daily_timeline, or its weekly
+    or monthly resample from adaptive_timeline)
+    """
+    fig, ax = plt.subplots(figsize=(10, 5))
+    ax.plot(daily_data['only_date'], daily_data['message'], color=SECONDARY_COLOR, linewidth=2, alpha=0.8)
+    _rotate_xticks(ax)
+    ax.set_xlabel('Date', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
+    ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def activity_bar_chart(activity, color=PRIMARY_COLOR):
+    """
+    Bar chart of messages per weekday or month (week/month_activity_map)
+    """
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar(activity.index, activity.values, color=color, edgecolor='white', linewidth=2)
+    _rotate_xticks(ax)
+    ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def activity_heatmap_chart(user_heatmap):
+    """
+    Weekday x hour-period heatmap (output of activity_heatmap)
+    """
+    fig, ax = plt.subplots(figsize=(14, 6))
+    sns.heatmap(user_heatmap, cmap='RdYlGn', linewidths=0.5, linecolor='white',
+                cbar_kws={'label': 'Message Count'}, annot=False, ax=ax)
+    ax.set_xlabel('Time Period', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Day of Week', fontsize=12, fontweight='bold')
+    fig.tight_layout()
+    return fig
+
+
+def busy_users_chart(x):
+    """
+    Labelled bar chart of messages per user (first output of most_busy_users)
+    """
+    fig, ax = plt.subplots(figsize=(10, 6))
+    bars = ax.bar(x.index, x.values, color=PRIMARY_COLOR, edgecolor='white', linewidth=2)
+    for bar in bars:
+        height = bar.get_height()
+        ax.text(bar.get_x() + bar.get_width()/2., height,
+                f'{int(height)}', ha='center', va='bottom', fontweight='bold')
+    _rotate_xticks(ax)
+    ax.set_ylabel('Messages', fontsize=12, fontweight='bold')
+    ax.set_title('Most Active Users', fontsize=14, fontweight='bold', pad=10)
+    ax.grid(axis='y', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def response_time_chart(histogram):
+    """
+    Bar chart of replies per latency bucket (output of response_time_histogram)
+    """
+    fig, ax = plt.subplots(figsize=(8, 5))
+    ax.bar(histogram.index, histogram.values, color=SECONDARY_COLOR, edgecolor='white', linewidth=2)
+    ax.set_xlabel('Reply Time', fontsize=12, fontweight='bold')
+    ax.set_ylabel('Replies', fontsize=12, fontweight='bold')
+    ax.grid(axis='y', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def common_words_chart(most_common_df):
+    """
+    Horizontal bar chart of the output of most_common_words
+    """
+    fig, ax = plt.subplots(figsize=(10, 8))
+    bars = ax.barh(most_common_df[0], most_common_df[1], color=PRIMARY_COLOR, edgecolor='white', linewidth=1.5)
+    for bar in bars:
+        width = bar.get_width()
+        ax.text(width, bar.get_y() + bar.get_height()/2., f' {int(width)}',
+                ha='left', va='center', fontweight='bold', fontsize=10)
+    ax.set_xlabel('Frequency', fontsize=12, fontweight='bold')
+    ax.set_title('Most Common Words', fontsize=14, fontweight='bold', pad=10)
+    ax.grid(axis='x', alpha=0.3)
+    fig.tight_layout()
+    return fig
+
+
+def emoji_pie_chart(emoji_df):
+    """
+    Pie chart of the five most used emojis (output of emoji_helper)
+    """
+    fig, ax = plt.subplots(figsize=(8, 8))
+    top_emojis = emoji_df.head(5)
+    sizes = top_emojis[1].values
+    emojis = top_emojis[0].values
+
+    explode = tuple([0.05] * len(top_emojis))
+
+    # Create pie chart without labels
+    ax.pie(
+        sizes,
+        autopct="%0.1f%%",
+        colors=PIE_COLORS,
+        startangle=90,
+        explode=explode,
+        shadow=True,
+        textprops={'fontsize': 12, 'weight': 'bold', 'color': 'white'}
+    )
+
+    # Create custom legend with emojis and counts
+    legend_labels = [f"{emoji}  ({count})" for emoji, count in zip(emojis, sizes)]
+    ax.legend(legend_labels, loc='center left', bbox_to_anchor=(1, 0, 0.5, 1),
+              fontsize=14, frameon=True, fancybox=True, shadow=True)
+
+    ax.set_title('Top 5 Most Used Emojis', fontsize=14, fontweight='bold', pad=20)
+    fig.tight_layout()
+    return fig
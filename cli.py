@@ -0,0 +1,346 @@
+"""
+Headless batch reports for a directory of WhatsApp exports
+
+Usage:
+    python cli.py EXPORTS_DIR -o REPORTS_DIR [--format json parquet] [--charts]
+                  [--users overall|all] [--workers N] [--pattern "*.txt"] [--recursive]
+
+Every export gets a folder under REPORTS_DIR holding report.json and/or one
+Parquet table per section, plus optional PNG charts. A run summary with
+per-file timings is written to REPORTS_DIR/summary.json. Zipped exports
+(``--pattern "*.zip"``) are read straight from the archive.
+"""
+import argparse
+import glob
+import json
+import math
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+import pandas as pd
+from preprocessor import preprocess_chat_file
+from archive import is_chat_archive, preprocess_chat_archive, media_summary
+from batch import USER_SECTIONS, analyze_user
+from helper import most_busy_users, render_wordcloud_png
+from textstats import NOTIFICATION_USER
+
+OUTPUT_FORMATS = ('json', 'parquet')
+
+# Column names for the sections that come back as unnamed pairs
+PAIR_COLUMNS = {
+    'common_words': ['word', 'count'],
+    'emojis': ['emoji', 'count'],
+}
+
+
+def to_jsonable(value):
+    """
+    Convert a helper result into plain JSON types
+
+    DataFrames become lists of records, Series become {label: value},
+    timestamps ISO strings, timedeltas seconds and NaN null.
+    """
+    if isinstance(value, pd.DataFrame):
+        if not isinstance(value.index, pd.RangeIndex):
+            return {str(label): to_jsonable(row) for label, row in value.iterrows()}
+        return [{str(key): to_jsonable(item) for key, item in record.items()}
+                for record in value.to_dict('records')]
+    if isinstance(value, pd.Series):
+        return {str(label): to_jsonable(item) for label, item in value.items()}
+    if isinstance(value, (tuple, list)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): to_jsonable(item) for key, item in value.items()}
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if isinstance(value, pd.Timedelta):
+        return None if pd.isna(value) else value.total_seconds()
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and math.isnan(value):
+        return None
+    if value is pd.NaT:
+        return None
+    return value
+
+
+def to_table(section, value):
+    """
+    Shape one user's section result as a flat DataFrame for Parquet
+    """
+    if section in PAIR_COLUMNS:
+        table = value.copy()
+        table.columns = PAIR_COLUMNS[section][:len(table.columns)]
+        return table
+    if section == 'response_pairs':
+        value = value.reset_index().rename(columns={'user': 'responder'})
+    if section == 'heatmap':
+        table = value.stack().rename('messages').reset_index()
+        return table.astype({'day_name': str, 'period': str})
+    if isinstance(value, pd.Series):
+        table = value.rename('replies' if section == 'response_histogram' else 'messages').reset_index()
+        first = table.columns[0]
+        if isinstance(table[first].dtype, pd.CategoricalDtype):
+            table[first] = table[first].astype(str)
+        return table
+    table = value.copy()
+    for column in table.columns:
+        if isinstance(table[column].dtype, pd.CategoricalDtype):
+            table[column] = table[column].astype(str)
+    return table
+
+
+def summary_row(user, report):
+    """
+    Scalar results of one user as a single Parquet row
+    """
+    row = {'user': user}
+    if 'stats' in report:
+        row.update(zip(['messages', 'words', 'media', 'links'], report['stats']))
+    if 'message_length' in report:
+        row.update(zip(['avg_length', 'max_length', 'min_length'], report['message_length']))
+    if 'response_time' in report:
+        response_time = report['response_time'] or {}
+        row['replies'] = response_time.get('replies', 0)
+        for stat in ('median', 'p90', 'mean'):
+            row[f'{stat}_response_seconds'] = to_jsonable(response_time.get(stat, pd.NaT))
+    if 'most_active_hour' in report:
+        hours = report['most_active_hour']
+        row['most_active_hour'] = int(hours.index[0]) if len(hours) else None
+    return row
+
+
+def write_parquet(reports, out_dir):
+    """
+    One Parquet file per table section (long format with a ``user`` column)
+    plus summary.parquet with the scalar results
+    """
+    tables = {}
+    for user, report in reports.items():
+        for section, value in report.items():
+            if isinstance(value, (pd.DataFrame, pd.Series)) and section != 'most_active_hour':
+                table = to_table(section, value)
+                table.insert(0, 'user', user)
+                tables.setdefault(section, []).append(table)
+    for section, parts in tables.items():
+        pd.concat(parts, ignore_index=True).to_parquet(os.path.join(out_dir, f'{section}.parquet'), index=False)
+    summary = pd.DataFrame([summary_row(user, report) for user, report in reports.items()])
+    summary.to_parquet(os.path.join(out_dir, 'summary.parquet'), index=False)
+
+
+def write_charts(df, reports, out_dir):
+    """
+    Save the dashboard charts of the Overall report as PNG files
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    import charts
+
+    report = reports.get('Overall') or next(iter(reports.values()))
+    figures = []
+    if 'monthly_timeline' in report:
+        figures.append(('monthly_timeline', charts.monthly_timeline_chart(report['monthly_timeline'])))
+    if 'daily_timeline' in report:
+        figures.append(('daily_timeline', charts.daily_timeline_chart(report['daily_timeline'])))
+    if 'week_activity' in report:
+        figures.append(('week_activity', charts.activity_bar_chart(report['week_activity'], charts.PRIMARY_COLOR)))
+    if 'month_activity' in report:
+        figures.append(('month_activity', charts.activity_bar_chart(report['month_activity'], charts.SECONDARY_COLOR)))
+    if 'heatmap' in report and not report['heatmap'].empty:
+        figures.append(('heatmap', charts.activity_heatmap_chart(report['heatmap'])))
+    if 'common_words' in report and not report['common_words'].empty:
+        figures.append(('common_words', charts.common_words_chart(report['common_words'])))
+    if 'emojis' in report and not report['emojis'].empty:
+        figures.append(('emojis', charts.emoji_pie_chart(report['emojis'])))
+    if 'response_histogram' in report:
+        figures.append(('response_times', charts.response_time_chart(report['response_histogram'])))
+    if 'Overall' in reports:
+        figures.append(('busy_users', charts.busy_users_chart(most_busy_users(df)[0])))
+
+    for name, fig in figures:
+        fig.savefig(os.path.join(out_dir, f'{name}.png'), dpi=100)
+        plt.close(fig)
+
+    image = render_wordcloud_png('Overall', df)
+    if image is not None:
+        with open(os.path.join(out_dir, 'wordcloud.png'), 'wb') as f:
+            f.write(image)
+
+
+def analyze_export(path, out_dir, formats=('json',), charts=False, users='overall', sections=None):
+    """
+    Parse one export, run the helper analytics and write its report files
+
+    Args:
+        path (str): Chat export to analyze, as text or as the exported .zip
+        out_dir (str): Folder for this export's outputs (created if needed)
+        formats (tuple): Any of OUTPUT_FORMATS
+        charts (bool): Also save PNG charts
+        users (str): 'overall' for the group-wide report only, 'all' to add
+            one report per participant
+        sections (iterable): Names from USER_SECTIONS; all when None
+
+    Returns:
+        dict: File name, sizes, counts and timing for the run summary
+    """
+    started = time.perf_counter()
+    zipped = is_chat_archive(path)
+    df = preprocess_chat_archive(path) if zipped else preprocess_chat_file(path)
+    parsed = time.perf_counter()
+    result = {
+        'file': path,
+        'bytes': os.path.getsize(path),
+        'messages': len(df),
+        'parse_seconds': round(parsed - started, 4),
+        'encoding': df.attrs.get('encoding'),
+        'replacements': df.attrs.get('replacements', 0),
+    }
+    if df.empty:
+        result['error'] = 'no messages recognized'
+        result['seconds'] = round(time.perf_counter() - started, 4)
+        return result
+
+    participants = sorted(user for user in df['user'].unique() if user != NOTIFICATION_USER)
+    selected = ['Overall'] + participants if users == 'all' else ['Overall']
+    reports = {user: analyze_user(user, df, sections) for user in selected}
+
+    os.makedirs(out_dir, exist_ok=True)
+    if 'json' in formats:
+        document = {
+            'file': os.path.basename(path),
+            'date_format': df.attrs.get('date_format'),
+            'messages': len(df),
+            'most_busy_users': to_jsonable(most_busy_users(df)[1]),
+            'users': to_jsonable(reports),
+        }
+        if zipped:
+            document['media'] = to_jsonable(media_summary(path))
+        with open(os.path.join(out_dir, 'report.json'), 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+    if 'parquet' in formats:
+        write_parquet(reports, out_dir)
+    if charts:
+        write_charts(df, reports, out_dir)
+
+    result['users'] = len(participants)
+    result['seconds'] = round(time.perf_counter() - started, 4)
+    return result
+
+
+def find_exports(input_dir, pattern='*.txt', recursive=False):
+    """
+    List export files under ``input_dir`` matching ``pattern``, sorted
+    """
+    if recursive:
+        pattern = os.path.join('**', pattern)
+    paths = glob.glob(os.path.join(input_dir, pattern), recursive=recursive)
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def report_dir(output_dir, input_dir, path):
+    """
+    Output folder for one export, mirroring its path relative to the input directory
+    """
+    relative = os.path.splitext(os.path.relpath(path, input_dir))[0]
+    return os.path.join(output_dir, relative.replace(os.sep, '__'))
+
+
+def _format_rate(value, unit):
+    return f"{value:,.1f} {unit}/s"
+
+
+def run(args):
+    """
+    Analyze every export concurrently and print progress to stderr
+
+    Returns:
+        int: Process exit code; 1 when any file failed
+    """
+    paths = find_exports(args.input_dir, args.pattern, args.recursive)
+    if not paths:
+        print(f"No files matching {args.pattern!r} in {args.input_dir}", file=sys.stderr)
+        return 1
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    formats = tuple(args.format)
+    workers = max(1, min(args.workers or os.cpu_count() or 1, len(paths)))
+    total = len(paths)
+    results = []
+    started = time.perf_counter()
+
+    def record(path, result):
+        results.append(result)
+        elapsed = time.perf_counter() - started
+        status = result.get('error') or f"{result['messages']:,} messages in {result['seconds']:.2f}s"
+        print(f"[{len(results)}/{total}] {os.path.relpath(path, args.input_dir)}: {status} "
+              f"({_format_rate(len(results) / elapsed, 'files')})", file=sys.stderr)
+
+    jobs = [(path, report_dir(args.output_dir, args.input_dir, path)) for path in paths]
+    options = dict(formats=formats, charts=args.charts, users=args.users, sections=args.sections)
+    if workers == 1:
+        for path, out_dir in jobs:
+            try:
+                result = analyze_export(path, out_dir, **options)
+            except Exception as e:
+                result = {'file': path, 'error': f"{type(e).__name__}: {e}"}
+            record(path, result)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(analyze_export, path, out_dir, **options): path for path, out_dir in jobs}
+            for future in as_completed(futures):
+                path = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    result = {'file': path, 'error': f"{type(e).__name__}: {e}"}
+                record(path, result)
+
+    elapsed = time.perf_counter() - started
+    total_bytes = sum(result.get('bytes', 0) for result in results)
+    total_messages = sum(result.get('messages', 0) for result in results)
+    failed = [result for result in results if 'error' in result]
+    summary = {
+        'files': total,
+        'failed': len(failed),
+        'workers': workers,
+        'seconds': round(elapsed, 3),
+        'messages': total_messages,
+        'bytes': total_bytes,
+        'results': sorted(results, key=lambda result: result['file']),
+    }
+    with open(os.path.join(args.output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+
+    print(f"Done: {total - len(failed)}/{total} files, {total_messages:,} messages in {elapsed:.1f}s "
+          f"({_format_rate(total / elapsed, 'files')}, {_format_rate(total_messages / elapsed, 'messages')}, "
+          f"{_format_rate(total_bytes / elapsed / 1e6, 'MB')})", file=sys.stderr)
+    return 1 if failed else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Analyze a directory of WhatsApp chat exports without the web app")
+    parser.add_argument('input_dir', help="Directory containing exported chats")
+    parser.add_argument('-o', '--output-dir', default='reports', help="Where reports are written (default: reports)")
+    parser.add_argument('--format', nargs='+', choices=OUTPUT_FORMATS, default=['json'],
+                        help="Report formats to write (default: json)")
+    parser.add_argument('--charts', action='store_true', help="Also save PNG charts of the Overall report")
+    parser.add_argument('--users', choices=('overall', 'all'), default='overall',
+                        help="Report only the whole chat, or every participant as well (default: overall)")
+    parser.add_argument('--sections', nargs='+', choices=list(USER_SECTIONS),
+                        help="Restrict the analysis to these sections (default: all)")
+    parser.add_argument('-w', '--workers', type=int, default=None,
+                        help="Files processed concurrently (default: number of CPUs)")
+    parser.add_argument('--pattern', default='*.txt', help="Glob for export files (default: *.txt)")
+    parser.add_argument('-r', '--recursive', action='store_true', help="Search subdirectories too")
+    return parser
+
+
+def main(argv=None):
+    return run(build_parser().parse_args(argv))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
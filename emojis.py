@@ -0,0 +1,109 @@
+import re
+from collections import Counter
+import emoji
+
+# Keycap emoji ("1️⃣") start with an ASCII character; only treat those
+# characters as candidates when the keycap combining mark follows.
+KEYCAP_STARTS = '0123456789#*'
+KEYCAP_PATTERN = r'[0-9#*](?=\ufe0f?\u20e3)'
+
+# Emoji start characters are grouped into ranges, merging gaps up to this
+# many codepoints; a short class scans much faster and the trie walk rejects
+# the few non-emoji characters it lets through.
+RANGE_GAP = 64
+
+_END = None
+
+_matcher = None
+
+
+class EmojiMatcher:
+    """
+    Longest-match finder for emoji sequences
+
+    A compiled character-class regex jumps straight to characters that may
+    start an emoji; a trie walk from each candidate then takes the longest
+    known sequence, so ZWJ sequences, skin-tone modifiers, keycaps and flags
+    count as one emoji instead of several codepoints.
+    """
+
+    def __init__(self, sequences):
+        self._trie = {}
+        for sequence in sequences:
+            node = self._trie
+            for char in sequence:
+                node = node.setdefault(char, {})
+            node[_END] = True
+
+        starts = sorted(ord(char) for char in self._trie if char not in KEYCAP_STARTS)
+        ranges = []
+        for codepoint in starts:
+            if ranges and codepoint - ranges[-1][1] <= RANGE_GAP:
+                ranges[-1][1] = codepoint
+            else:
+                ranges.append([codepoint, codepoint])
+        char_class = ''.join(
+            re.escape(chr(low)) + ('-' + re.escape(chr(high)) if high > low else '')
+            for low, high in ranges
+        )
+        self._starts = re.compile('[' + char_class + ']')
+        # The keycap alternative slows the scan, so it is only used on text containing U+20E3
+        self._starts_with_keycaps = re.compile('[' + char_class + ']|' + KEYCAP_PATTERN)
+
+    def findall(self, text):
+        """
+        Return every emoji sequence in ``text`` in order of appearance
+        """
+        found = []
+        if text.isascii():
+            return found
+        starts = self._starts_with_keycaps if '\u20e3' in text else self._starts
+        search = starts.search
+        trie = self._trie
+        length = len(text)
+        match = search(text)
+        while match is not None:
+            start = index = match.start()
+            node, end = trie, -1
+            while index < length:
+                node = node.get(text[index])
+                if node is None:
+                    break
+                index += 1
+                if _END in node:
+                    end = index
+            if end > 0:
+                found.append(text[start:end])
+                match = search(text, end)
+            else:
+                match = search(text, start + 1)
+        return found
+
+    def count(self, text):
+        """
+        Count occurrences of each emoji sequence in ``text``
+        """
+        return Counter(self.findall(text))
+
+
+def get_emoji_matcher():
+    """
+    Return the module-level matcher over ``emoji.EMOJI_DATA``, building it on first use
+    """
+    global _matcher
+    if _matcher is None:
+        _matcher = EmojiMatcher(emoji.EMOJI_DATA)
+    return _matcher
+
+
+def count_emojis(text):
+    """
+    Count full emoji sequences in a text
+
+    Args:
+        text (str): Message text, or many messages joined together
+
+    Returns:
+        Counter: Occurrences per emoji sequence
+    """
+    return get_emoji_matcher().count(text)
@@ -1,116 +1,117 @@
-from urlextract import URLExtract
-extractor = URLExtract()
-from wordcloud import WordCloud
+import io
+import re
 from collections import Counter
+from wordcloud import WordCloud
 import pandas as pd
-import emoji
-import os
+from aggregates import get_chat_index
+from links import LINK_REGEX
+from preprocessor import media_mask
+from response_times import get_response_times
+from stopwords import get_stop_words
+
+# Default word cloud options; create_wordcloud accepts overrides for any of them
+WORDCLOUD_SETTINGS = {
+    'width': 800,
+    'height': 400,
+    'min_font_size': 10,
+    'background_color': 'white',
+    'colormap': 'viridis',
+    'relative_scaling': 0.5,
+    'max_words': 100,
+}
+
+# Punctuation, symbols and emoji around a whitespace token ("ok!", "(see", "nice😀")
+TOKEN_EDGES = re.compile(r"^[\W_]+|[\W_]+$")
+
+
+def cloud_frequencies(word_counts, stop_words=None):
+    """
+    Fold whitespace-token counts into the words a word cloud should show
+    
+    Punctuation and emoji around a word are stripped, so "ok!", "ok," and
+    "ok" add up; links, numbers, single characters and tokens with no
+    letters left (emoji, symbols) are dropped, much like the tokenizing of
+    WordCloud.generate.
+    
+    Args:
+        word_counts (Counter): Lowercased token counts from the text pass
+        stop_words (frozenset): Words dropped once stripped; the default
+            locale from the stop-word registry when None
+    
+    Returns:
+        Counter: Word frequencies for generate_from_frequencies
+    """
+    if stop_words is None:
+        stop_words = get_stop_words()
+    frequencies = Counter()
+    for token, count in word_counts.items():
+        if '://' in token:
+            continue
+        word = TOKEN_EDGES.sub('', token)
+        if len(word) < 2 or word.isdigit() or word in stop_words or LINK_REGEX.fullmatch(word):
+            continue
+        frequencies[word] += count
+    return frequencies
 
 
 def fetch_stats(selected_user, df):
     """
     Fetch statistics for messages, words, media, and links
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    # Fetch the number of messages
-    num_messages = df.shape[0]
-    
-    # Fetch the total number of words
-    words = []
-    for message in df['message']:
-        words.extend(message.split())
-    num_words = len(words)
-    
-    # Fetch number of media messages
-    num_media_messages = df[df['message'] == '<Media omitted>'].shape[0]
-    
-    # Fetch number of links shared
-    links = []
-    for message in df['message']:
-        links.extend(extractor.find_urls(message))
-    num_links = len(links)
-    
-    return num_messages, num_words, num_media_messages, num_links
+    return get_chat_index(df).fetch_stats(selected_user)
 
 
 def most_busy_users(df):
     """
     Get the most busy users in the group
     """
-    busy_users = df['user'].value_counts().head()
-    df_percent = round((df['user'].value_counts() / df.shape[0]) * 100, 2).reset_index()
-    df_percent.columns = ['name', 'percent']
-    return busy_users, df_percent
+    return get_chat_index(df).most_busy_users()
 
 
-def create_wordcloud(selected_user, df):
+def create_wordcloud(selected_user, df, **settings):
     """
     Create a word cloud from messages
-    """
-    # Load stop words
-    if os.path.exists('stop_hinglish.txt'):
-        with open('stop_hinglish.txt', 'r', encoding='utf-8') as f:
-            stop_words = f.read().splitlines()
-    else:
-        stop_words = []
-    
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
     
-    # Filter out group notifications and media messages
-    temp = df[df['user'] != 'group_notification']
-    temp = temp[temp['message'] != '<Media omitted>']
+    Args:
+        selected_user (str): User name or 'Overall'
+        df (pd.DataFrame): Processed chat
+        **settings: WordCloud options overriding WORDCLOUD_SETTINGS
     
-    def remove_stop_words(message):
-        """Remove stop words from message"""
-        words = []
-        for word in message.lower().split():
-            if word not in stop_words:
-                words.append(word)
-        return " ".join(words)
+    Returns:
+        WordCloud: The generated word cloud
+    """
+    options = {**WORDCLOUD_SETTINGS, **settings}
+    # Word frequencies from the shared text pass, cleaned of punctuation,
+    # links and emoji; only the words that can appear in the cloud are handed over
+    word_counts = cloud_frequencies(get_chat_index(df).text.word_counter(selected_user))
+    frequencies = dict(word_counts.most_common(options['max_words']))
     
     # Generate word cloud
-    wc = WordCloud(
-        width=800, 
-        height=400, 
-        min_font_size=10, 
-        background_color='white',
-        colormap='viridis',
-        relative_scaling=0.5,
-        max_words=100
-    )
-    temp['message'] = temp['message'].apply(remove_stop_words)
-    df_wc = wc.generate(temp['message'].str.cat(sep=" "))
+    wc = WordCloud(**options)
+    df_wc = wc.generate_from_frequencies(frequencies)
     return df_wc
 
 
+def render_wordcloud_png(selected_user, df, **settings):
+    """
+    Render the word cloud straight to PNG bytes, skipping a matplotlib figure
+    
+    Returns:
+        bytes: PNG image, or None when the selection has no words
+    """
+    if not cloud_frequencies(get_chat_index(df).text.word_counter(selected_user)):
+        return None
+    buffer = io.BytesIO()
+    create_wordcloud(selected_user, df, **settings).to_image().save(buffer, format='PNG')
+    return buffer.getvalue()
+
+
 def most_common_words(selected_user, df):
     """
     Get the most common words used in messages
     """
-    # Load stop words
-    if os.path.exists('stop_hinglish.txt'):
-        with open('stop_hinglish.txt', 'r', encoding='utf-8') as f:
-            stop_words = f.read().splitlines()
-    else:
-        stop_words = []
-    
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    # Filter out group notifications and media messages
-    temp = df[df['user'] != 'group_notification']
-    temp = temp[temp['message'] != '<Media omitted>']
-    
-    words = []
-    for message in temp['message']:
-        for word in message.lower().split():
-            if word not in stop_words:
-                words.append(word)
-    
-    most_common_df = pd.DataFrame(Counter(words).most_common(20))
+    word_counts = get_chat_index(df).text.word_counter(selected_user)
+    most_common_df = pd.DataFrame(word_counts.most_common(20))
     return most_common_df
 
 
@@ -118,14 +119,8 @@ def emoji_helper(selected_user, df):
     """
     Extract and count emojis from messages
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    emojis = []
-    for message in df['message']:
-        emojis.extend([c for c in message if c in emoji.EMOJI_DATA])
-    
-    emoji_df = pd.DataFrame(Counter(emojis).most_common(len(Counter(emojis))))
+    emoji_counts = get_chat_index(df).text.emoji_counter(selected_user)
+    emoji_df = pd.DataFrame(emoji_counts.most_common())
     return emoji_df
 
 
@@ -133,80 +128,44 @@ def monthly_timeline(selected_user, df):
     """
     Create monthly timeline of messages
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    timeline = df.groupby(['year', 'month_num', 'month']).count()['message'].reset_index()
-    
-    time = []
-    for i in range(timeline.shape[0]):
-        time.append(timeline['month'][i] + "-" + str(timeline['year'][i]))
-    
-    timeline['time'] = time
-    return timeline
+    return get_chat_index(df).monthly_timeline(selected_user)
 
 
 def daily_timeline(selected_user, df):
     """
     Create daily timeline of messages
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    daily_timeline = df.groupby('only_date').count()['message'].reset_index()
-    return daily_timeline
+    return get_chat_index(df).daily_timeline(selected_user)
 
 
 def week_activity_map(selected_user, df):
     """
     Get activity map by day of the week
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    return df['day_name'].value_counts()
+    return get_chat_index(df).week_activity_map(selected_user)
 
 
 def month_activity_map(selected_user, df):
     """
     Get activity map by month
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    return df['month'].value_counts()
+    return get_chat_index(df).month_activity_map(selected_user)
 
 
 def activity_heatmap(selected_user, df):
     """
     Create activity heatmap showing messages by day and time period
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    user_heatmap = df.pivot_table(
-        index='day_name', 
-        columns='period', 
-        values='message', 
-        aggfunc='count'
-    ).fillna(0)
-    
-    # Reorder days of the week
-    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-    user_heatmap = user_heatmap.reindex([day for day in day_order if day in user_heatmap.index])
-    
-    return user_heatmap
+    return get_chat_index(df).activity_heatmap(selected_user)
 
 
 def get_message_length_stats(selected_user, df):
     """
     Get statistics about message lengths
     """
+    temp = df[(df['user'] != 'group_notification') & ~media_mask(df)]
     if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    temp = df[df['user'] != 'group_notification']
-    temp = temp[temp['message'] != '<Media omitted>']
+        temp = temp[temp['user'] == selected_user]
     
     temp['message_length'] = temp['message'].str.len()
     
@@ -219,27 +178,46 @@ def get_message_length_stats(selected_user, df):
 
 def get_response_time_stats(selected_user, df):
     """
-    Calculate average response time between messages
-    """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-    
-    temp = df[df['user'] != 'group_notification'].copy()
-    temp = temp.sort_values('date')
-    
-    if len(temp) > 1:
-        temp['time_diff'] = temp['date'].diff()
-        avg_response_time = temp['time_diff'].mean()
-        return avg_response_time
+    Get reply latency statistics: how long the user (or anyone, for
+    'Overall') takes to answer someone else's message
     
-    return None
+    Returns:
+        dict: replies, median, p90 and mean (Timedeltas), or None when
+        there are no replies
+    """
+    return get_response_times(df).stats(selected_user)
+
+
+def response_time_histogram(selected_user, df):
+    """
+    Count replies per latency bucket (under a minute, 1-5 minutes, ...)
+    """
+    return get_response_times(df).histogram(selected_user)
+
+
+def response_time_pairs(selected_user, df):
+    """
+    Reply latency per (user, replied_to) pair, for the user's replies unless 'Overall'
+    """
+    return get_response_times(df).per_pair(selected_user)
+
+
+def response_time_by_user(df):
+    """
+    Reply latency distribution of every user in the group
+    """
+    return get_response_times(df).per_user()
+
+
+def conversation_starters(df):
+    """
+    Count the conversation sessions each user started
+    """
+    return get_response_times(df).starters()
 
 
 def get_most_active_hour(selected_user, df):
     """
     Get the most active hour of the day
     """
-    if selected_user != 'Overall':
-        df = df[df['user'] == selected_user]
-
-    return df['hour'].value_counts().head(1)
\ No newline at end of file
+    return get_chat_index(df).most_active_hour(selected_user)
@@ -0,0 +1,110 @@
+import plotly.graph_objects as go
+from charts import PRIMARY_COLOR, SECONDARY_COLOR, PIE_COLORS
+from timeline import MAX_POINTS, downsample_timeline
+
+# Plotly counterparts of the figures in charts.py, taking the same aggregated
+# data; the browser draws them, so the server only sends a small JSON spec.
+
+
+def _layout(fig, height, x_title=None, y_title=None, title=None):
+    fig.update_layout(
+        template='plotly_white',
+        height=height,
+        margin=dict(l=10, r=10, t=50 if title else 20, b=10),
+        title=dict(text=title, font=dict(size=16)) if title else None,
+        xaxis_title=x_title,
+        yaxis_title=y_title,
+        showlegend=False,
+    )
+    return fig
+
+
+def monthly_timeline_chart(timeline_data):
+    """
+    Line chart of messages per month (output of monthly_timeline)
+    """
+    fig = go.Figure(go.Scatter(
+        x=timeline_data['time'], y=timeline_data['message'], mode='lines+markers',
+        line=dict(color=PRIMARY_COLOR, width=3), fill='tozeroy',
+    ))
+    return _layout(fig, 420, 'Time Period', 'Messages')
+
+
+def daily_timeline_chart(daily_data, max_points=MAX_POINTS):
+    """
+    Line chart of messages per day (output of daily_timeline, or its weekly
+    or monthly resample from adaptive_timeline), down-sampled to
+    ``max_points`` with LTTB as a safety net
+    """
+    daily_data = downsample_timeline(daily_data, 'only_date', 'message', max_points)
+    fig = go.Figure(go.Scattergl(
+        x=daily_data['only_date'], y=daily_data['message'], mode='lines',
+        line=dict(color=SECONDARY_COLOR, width=2),
+    ))
+    return _layout(fig, 420, 'Date', 'Messages')
+
+
+def activity_bar_chart(activity, color=PRIMARY_COLOR):
+    """
+    Bar chart of messages per weekday or month (week/month_activity_map)
+    """
+    fig = go.Figure(go.Bar(x=activity.index.astype(str), y=activity.values, marker_color=color))
+    return _layout(fig, 400, None, 'Messages')
+
+
+def activity_heatmap_chart(user_heatmap):
+    """
+    Weekday x hour-period heatmap (output of activity_heatmap)
+    """
+    fig = go.Figure(go.Heatmap(
+        z=user_heatmap.to_numpy(), x=user_heatmap.columns.astype(str), y=user_heatmap.index.astype(str),
+        colorscale='RdYlGn', colorbar=dict(title='Message Count'), xgap=1, ygap=1,
+    ))
+    fig.update_yaxes(autorange='reversed')
+    return _layout(fig, 450, 'Time Period', 'Day of Week')
+
+
+def busy_users_chart(x):
+    """
+    Labelled bar chart of messages per user (first output of most_busy_users)
+    """
+    fig = go.Figure(go.Bar(
+        x=x.index.astype(str), y=x.values, marker_color=PRIMARY_COLOR,
+        text=x.values, textposition='outside',
+    ))
+    return _layout(fig, 450, None, 'Messages', 'Most Active Users')
+
+
+def response_time_chart(histogram):
+    """
+    Bar chart of replies per latency bucket (output of response_time_histogram)
+    """
+    fig = go.Figure(go.Bar(x=histogram.index.astype(str), y=histogram.values, marker_color=SECONDARY_COLOR))
+    return _layout(fig, 400, 'Reply Time', 'Replies')
+
+
+def common_words_chart(most_common_df):
+    """
+    Horizontal bar chart of the output of most_common_words
+    """
+    fig = go.Figure(go.Bar(
+        x=most_common_df[1], y=most_common_df[0], orientation='h', marker_color=PRIMARY_COLOR,
+        text=most_common_df[1], textposition='outside',
+    ))
+    fig.update_yaxes(autorange='reversed')
+    return _layout(fig, 600, 'Frequency', None, 'Most Common Words')
+
+
+def emoji_pie_chart(emoji_df):
+    """
+    Pie chart of the five most used emojis (output of emoji_helper)
+    """
+    top_emojis = emoji_df.head(5)
+    fig = go.Figure(go.Pie(
+        labels=top_emojis[0], values=top_emojis[1], marker=dict(colors=PIE_COLORS),
+        pull=[0.05] * len(top_emojis), sort=False, textinfo='percent',
+        hovertemplate='%{label}  (%{value})<extra></extra>',
+    ))
+    fig = _layout(fig, 450, title='Top 5 Most Used Emojis')
+    fig.update_layout(showlegend=True, legend=dict(font=dict(size=18)))
+    return fig
@@ -0,0 +1,172 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+import pandas as pd
+from preprocessor import preprocess_whatsapp_chat, preprocess_chat_file
+from archive import is_chat_archive, preprocess_chat_archive
+from aggregates import ChatIndex, get_chat_index, set_chat_index
+from textstats import NOTIFICATION_USER
+
+# Selection that stands for every chat of a MultiChat at once
+ALL_CHATS = 'All chats'
+
+
+def _parse_export(source):
+    """
+    Parse one export given as raw bytes or a file path and build its index
+    """
+    if is_chat_archive(source):
+        df = preprocess_chat_archive(source)
+    elif isinstance(source, (bytes, bytearray)):
+        df = preprocess_whatsapp_chat(io.BytesIO(source))
+    else:
+        df = preprocess_chat_file(source)
+    return df, (ChatIndex.from_frame(df) if not df.empty else None)
+
+
+def parse_exports(sources, workers=None):
+    """
+    Parse several chat exports concurrently, one process per export
+
+    Each worker also builds the chat's aggregate index, which is registered
+    for the returned DataFrame so helper calls on it never rescan.
+
+    Args:
+        sources (dict): Chat id -> raw bytes or path of an export (.txt or .zip)
+        workers (int): Worker processes; os.cpu_count() when None, and 1
+            parses everything in this process
+
+    Returns:
+        dict: Chat id -> processed DataFrame, in input order
+    """
+    sources = {chat_id: bytes(source) if isinstance(source, memoryview) else source
+               for chat_id, source in sources.items()}
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(sources)))
+
+    if workers == 1:
+        parsed = {chat_id: _parse_export(source) for chat_id, source in sources.items()}
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {chat_id: pool.submit(_parse_export, source) for chat_id, source in sources.items()}
+            parsed = {chat_id: future.result() for chat_id, future in futures.items()}
+
+    chats = {}
+    for chat_id, (df, index) in parsed.items():
+        if index is not None:
+            set_chat_index(df, index)
+        chats[chat_id] = df
+    return chats
+
+
+class MultiChat:
+    """
+    Several processed chats analysed side by side or as one
+
+    Every chat keeps its own DataFrame and aggregate index, so the helper
+    functions answer per-chat queries on ``chat(chat_id)`` as usual. The
+    combined view is one table partitioned by a ``chat_id`` column whose
+    index is the sum of the per-chat indexes; it is built once, so helper
+    calls across all chats are lookups rather than a concatenate-and-rescan
+    per query. Users with the same name in different chats are treated as
+    the same person.
+
+    Attributes:
+        chats (dict): Chat id -> processed DataFrame, empty chats left out
+    """
+
+    def __init__(self, chats):
+        self.chats = {chat_id: df for chat_id, df in chats.items() if not df.empty}
+        self._frame = None
+
+    @classmethod
+    def from_exports(cls, sources, workers=None):
+        """
+        Parse the exports concurrently (see parse_exports) and combine them
+        """
+        return cls(parse_exports(sources, workers))
+
+    @property
+    def chat_ids(self):
+        return list(self.chats)
+
+    def chat(self, chat_id):
+        """
+        The processed DataFrame of one chat
+        """
+        return self.chats[chat_id]
+
+    @property
+    def frame(self):
+        """
+        All chats in one DataFrame with a categorical ``chat_id`` column
+
+        Rows stay grouped by chat in input order; the combined aggregate
+        index is registered for it, so it can be passed to any helper.
+        """
+        if self._frame is None:
+            frames = list(self.chats.values())
+            users = pd.Index([])
+            for df in frames:
+                users = users.union(df['user'].cat.categories)
+            frame = pd.concat([
+                df.assign(user=df['user'].cat.set_categories(users)) for df in frames
+            ], ignore_index=True)
+            codes = np.repeat(np.arange(len(frames)), [len(df) for df in frames])
+            frame.insert(0, 'chat_id', pd.Categorical.from_codes(codes, categories=self.chat_ids))
+            set_chat_index(frame, ChatIndex.combine([get_chat_index(df) for df in frames]))
+            self._frame = frame
+        return self._frame
+
+    def select(self, chat_id=ALL_CHATS):
+        """
+        The DataFrame for one chat, or the combined frame for ALL_CHATS
+        """
+        return self.frame if chat_id == ALL_CHATS else self.chat(chat_id)
+
+    def summary(self):
+        """
+        One row per chat: messages, participants, words, media, links and date range
+
+        Returns:
+            pd.DataFrame: Indexed by chat id
+        """
+        rows = []
+        for chat_id, df in self.chats.items():
+            index = get_chat_index(df)
+            totals = index.totals.drop(NOTIFICATION_USER, errors='ignore')
+            dates = index.daily.index.get_level_values('only_date')
+            rows.append({
+                'chat_id': chat_id,
+                'messages': int(totals['messages'].sum()),
+                'participants': len(totals),
+                'words': int(totals['words'].sum()),
+                'media': int(totals['media'].sum()),
+                'links': int(totals['links'].sum()),
+                'first': dates.min(),
+                'last': dates.max(),
+            })
+        return pd.DataFrame(rows).set_index('chat_id')
+
+    def user_chats(self, min_chats=1):
+        """
+        Messages per user in each chat, to compare the same people across chats
+
+        Args:
+            min_chats (int): Only keep users active in at least this many chats
+
+        Returns:
+            pd.DataFrame: Users x chat ids, plus 'chats' (number of chats the
+            user wrote in) and 'total'; most widely shared users first
+        """
+        counts = pd.DataFrame({
+            chat_id: get_chat_index(df).totals['messages'].drop(NOTIFICATION_USER, errors='ignore')
+            for chat_id, df in self.chats.items()
+        }).fillna(0).astype('int64')
+        counts.index.name = 'user'
+        counts['chats'] = (counts[self.chat_ids] > 0).sum(axis=1)
+        counts['total'] = counts[self.chat_ids].sum(axis=1)
+        counts = counts[counts['chats'] >= min_chats]
+        return counts.sort_values(['chats', 'total'], ascending=False, kind='stable')
@@ -1,133 +1,705 @@
+import codecs
+import mmap
+import os
 import re
+from collections import Counter
+import numpy as np
 import pandas as pd
 
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+except ImportError:  # pyarrow is optional; dates are then parsed by pandas
+    pa = pc = None
 
-def preprocess_whatsapp_chat(data):
+
+# Date part shared by the header formats: day and month in either order, with
+# "/", "." or "-" separators and a 2 or 4 digit year, e.g. "18/10/26" or "18.10.2026"
+DATE_PATTERN = r'\d{1,2}[/.-]\d{1,2}[/.-]\d{2,4},?\s'
+
+# Localized 12-hour markers that strptime's %p does not know, and the marker it does
+MERIDIEM_SPELLINGS = {
+    **dict.fromkeys(['a. m.', 'a.m.', 'A. M.', 'A.M.', 'vorm.', 'Vorm.'], 'am'),
+    **dict.fromkeys(['p. m.', 'p.m.', 'P. M.', 'P.M.', 'nachm.', 'Nachm.'], 'pm'),
+}
+LOCALIZED_MERIDIEM = '(?:' + '|'.join(re.escape(spelling) for spelling in MERIDIEM_SPELLINGS) + ')'
+
+# Whole-message placeholders standing in for media: Android writes one for
+# every attachment left out of the export; iOS names the attachment type, or
+# the attached file when exporting with media, after a U+200E mark
+ANDROID_MEDIA_PATTERN = re.escape('<Media omitted>')
+IOS_MEDIA_PATTERN = (
+    '\u200e?(?:image|video|audio|GIF|sticker|document|Contact card) omitted'
+    '|[^\n]*\u200edocument omitted'
+    '|\u200e?<attached: [^>\n]+>'
+)
+
+# Supported message header formats, in detection priority order. Each pattern
+# captures the timestamp in a single group and ends with the separator before
+# the sender; the tokenizer prepends the line break and appends the optional
+# "sender: " group itself. Entries may carry a ``normalize`` function that
+# rewrites the captured timestamps into a layout detect_date_format knows,
+# and every entry has the ``media`` pattern of its placeholder messages.
+# Add formats with register_header_format.
+HEADER_FORMATS = []
+
+# Optional "sender: " prefix on the header line; absent for group notifications
+SENDER_PATTERN = r'(?:([^:\n]+):\s)?'
+
+# Number of characters inspected when detecting the header format
+SAMPLE_SIZE = 64 * 1024
+
+# Streaming ingest: characters/bytes read per chunk and messages per DataFrame batch
+CHUNK_SIZE = 4 * 1024 * 1024
+BATCH_SIZE = 200_000
+
+# Bytes inspected when detecting the encoding of a binary export
+ENCODING_SAMPLE_SIZE = 4096
+
+# Byte order marks, longest first so UTF-32 LE is not taken for UTF-16 LE
+BOMS = [
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+]
+
+# Timestamp layout used for date format detection, e.g. "18/10/26, 2:05\u202fpm"
+TIMESTAMP_PATTERN = re.compile(
+    r'(?P<first>\d{1,2})(?P<sep>[./-])(?P<second>\d{1,2})(?P=sep)(?P<year>\d{2,4})'
+    r'(?P<joiner>,?\s+)(?P<hour>\d{1,2}):(?P<minute>\d{2})(?P<seconds>:\d{2})?'
+    r'(?:(?P<meridiem_sep>\s*)(?P<meridiem>[ap]m))?$',
+    re.IGNORECASE,
+)
+
+# Number of timestamps inspected when detecting the date format
+DATE_SAMPLE_SIZE = 1000
+
+# Fixed orderings for the categorical feature columns
+MONTH_NAMES = [
+    'January', 'February', 'March', 'April', 'May', 'June',
+    'July', 'August', 'September', 'October', 'November', 'December',
+]
+DAY_NAMES = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+PERIOD_LABELS = [f"{hour:02d}-{(hour + 1) % 24:02d}" for hour in range(24)]
+TIME_OF_DAY_LABELS = ['Morning', 'Afternoon', 'Evening', 'Night']
+
+MONTH_DTYPE = pd.CategoricalDtype(MONTH_NAMES, ordered=True)
+DAY_DTYPE = pd.CategoricalDtype(DAY_NAMES, ordered=True)
+PERIOD_DTYPE = pd.CategoricalDtype(PERIOD_LABELS, ordered=True)
+TIME_OF_DAY_DTYPE = pd.CategoricalDtype(TIME_OF_DAY_LABELS, ordered=True)
+
+# TIME_OF_DAY_LABELS code per hour: Morning 5-11, Afternoon 12-16, Evening 17-20, Night otherwise
+TIME_OF_DAY_BY_HOUR = np.array([3] * 5 + [0] * 7 + [1] * 5 + [2] * 4 + [3] * 3, dtype=np.int8)
+
+_tokenizers = {}
+_sampler = None
+
+
+def register_header_format(name, pattern, normalize=None, index=None, media=ANDROID_MEDIA_PATTERN):
     """
-    Preprocess WhatsApp chat data and extract structured information
+    Add a message header format to the HEADER_FORMATS registry
+    
+    Args:
+        name (str): Unique name; registering it again replaces the entry
+        pattern (str): Regex for the header up to the sender, capturing the
+            timestamp in its only group
+        normalize (callable): Optional function mapping the list of captured
+            timestamps to ones detect_date_format and strptime understand
+        index (int): Position in the detection order; appended when None
+        media (str): Regex matching a whole media placeholder message of
+            exports in this format
+    
+    Returns:
+        dict: The registered entry
+    """
+    global _sampler
+    header_format = {'name': name, 'pattern': pattern, 'media': media}
+    if normalize is not None:
+        header_format['normalize'] = normalize
+    for i, existing in enumerate(HEADER_FORMATS):
+        if existing['name'] == name:
+            del HEADER_FORMATS[i]
+            break
+    HEADER_FORMATS.insert(len(HEADER_FORMATS) if index is None else index, header_format)
+    _tokenizers.pop(name, None)
+    _sampler = None
+    return header_format
+
+
+def normalize_meridiems(timestamps):
+    """
+    Rewrite localized am/pm markers ("2:05 p. m.", "2:05 nachm.") as "2:05 pm"
+    
+    The timestamps are joined and each spelling replaced with one plain
+    string pass, then split again, instead of substituting row by row.
+    """
+    text = '\n'.join(timestamps)
+    for spelling, marker in MERIDIEM_SPELLINGS.items():
+        if spelling in text:
+            text = text.replace(spelling, marker)
+    return text.split('\n')
+
+
+# Android: "18/10/26, 2:05 pm - Name: text"; newer exports put U+202F before am/pm
+register_header_format(
+    'android_12h_thin_space', r'(' + DATE_PATTERN + r'\d{1,2}:\d{2}\u202F[AaPp][Mm])\s-\s',
+)
+register_header_format(
+    'android_12h', r'(' + DATE_PATTERN + r'\d{1,2}:\d{2}\s[AaPp][Mm])\s-\s',
+)
+register_header_format(
+    'android_24h', r'(' + DATE_PATTERN + r'\d{1,2}:\d{2})\s-\s',
+)
+register_header_format(
+    'android_12h_localized', r'(' + DATE_PATTERN + r'\d{1,2}:\d{2}\s?' + LOCALIZED_MERIDIEM + r')\s-\s',
+    normalize=normalize_meridiems,
+)
+# iOS: "[18/10/26, 14:05:33] Name: text"; media and system lines start with U+200E
+register_header_format(
+    'ios_24h', r'\u200e?\[(' + DATE_PATTERN + r'\d{1,2}:\d{2}(?::\d{2})?)\]\s',
+    media=IOS_MEDIA_PATTERN,
+)
+register_header_format(
+    'ios_12h', r'\u200e?\[(' + DATE_PATTERN + r'\d{1,2}:\d{2}(?::\d{2})?\s?[AaPp][Mm])\]\s',
+    media=IOS_MEDIA_PATTERN,
+)
+register_header_format(
+    'ios_12h_localized',
+    r'\u200e?\[(' + DATE_PATTERN + r'\d{1,2}:\d{2}(?::\d{2})?\s?' + LOCALIZED_MERIDIEM + r')\]\s',
+    normalize=normalize_meridiems, media=IOS_MEDIA_PATTERN,
+)
+
+
+def get_media_pattern(name=None):
+    """
+    Regex of the media placeholder messages of a header format
+    
+    Args:
+        name (str): Name of a HEADER_FORMATS entry, e.g. df.attrs['header_format']
+    
+    Returns:
+        str: The format's media pattern; for an unknown or missing name
+        (such as several chats combined) one accepting every registered one
+    """
+    for header_format in HEADER_FORMATS:
+        if header_format['name'] == name:
+            return header_format['media']
+    patterns = dict.fromkeys(header_format['media'] for header_format in HEADER_FORMATS)
+    return '|'.join(f'(?:{pattern})' for pattern in patterns)
+
+
+def media_mask(df):
+    """
+    Mark the media placeholder messages of a processed chat
+    
+    Returns:
+        pd.Series: Boolean Series aligned with ``df``, using the placeholder
+        of the export's header format (``df.attrs['header_format']``)
+    """
+    pattern = get_media_pattern(df.attrs.get('header_format'))
+    return df['message'].str.fullmatch(pattern).astype(bool)
+
+
+def get_tokenizer(header_format):
+    """
+    Compile (once) the line-anchored tokenizer regex for a header format
+    
+    Anchoring on a literal line break rather than ``^`` lets the regex engine
+    skip straight to candidate line starts.
+    """
+    name = header_format['name']
+    if name not in _tokenizers:
+        _tokenizers[name] = re.compile(
+            '\n' + header_format['pattern'] + SENDER_PATTERN
+        )
+    return _tokenizers[name]
+
+
+def get_sampler():
+    """
+    Compile (once per registry change) one regex alternating every header format
+    
+    Each format is wrapped in a group named after its position, so a single
+    scan of the sample tells which format every header line matches.
+    """
+    global _sampler
+    if _sampler is None:
+        _sampler = re.compile('\n(?:' + '|'.join(
+            f"(?P<f{i}>{header_format['pattern']})" for i, header_format in enumerate(HEADER_FORMATS)
+        ) + ')')
+    return _sampler
+
+
+def detect_header_format(sample):
+    """
+    Detect which header format a chat export uses from a sample of its text
+    
+    Args:
+        sample (str): Leading portion of the chat export
+    
+    Returns:
+        dict | None: The entry of HEADER_FORMATS matching the most header
+        lines (the earlier one on ties), or None
+    """
+    counts = Counter(match.lastgroup for match in get_sampler().finditer('\n' + sample))
+    if not counts:
+        return None
+    best = max(counts, key=lambda group: (counts[group], -int(group[1:])))
+    return HEADER_FORMATS[int(best[1:])]
+
+
+def tokenize_chat(data, header_format):
+    """
+    Split chat text into timestamp, sender and message columns in one scan
     
     Args:
         data (str): Raw WhatsApp chat export text
+        header_format (dict): Entry of HEADER_FORMATS used by the export
     
     Returns:
-        pd.DataFrame: Processed DataFrame with extracted features
+        tuple: (timestamps, users, messages) lists of equal length, with
+        users set to 'group_notification' for system messages
     """
-    # Regex pattern including Unicode thin space (\u202F) before am/pm
-    # Supports multiple date formats
-    patterns = [
-        r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\u202F[ap]m\s-\s',  # With thin space
-        r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s[ap]m\s-\s',      # With regular space
-        r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}\s-\s',              # 24-hour format
+    # With two capture groups re.split yields
+    # [preamble, timestamp, sender, message, timestamp, sender, message, ...]
+    parts = get_tokenizer(header_format).split('\n' + data)
+    timestamps = parts[1::3]
+    if 'normalize' in header_format:
+        timestamps = header_format['normalize'](timestamps)
+    users = [
+        'group_notification' if user is None else user.strip()
+        for user in parts[2::3]
     ]
+    messages = [message.strip() for message in parts[3::3]]
+    return timestamps, users, messages
+
+
+def detect_date_format(timestamps, sample_size=DATE_SAMPLE_SIZE, day_first=True):
+    """
+    Infer the strftime format of header timestamps from a small sample
     
-    dates = []
-    messages = []
-    pattern_used = None
+    Day/month order is decided from value ranges: a field above 12 can only
+    be the day. When the sample stays within 1-12 every timestamp is checked
+    before the order is called ambiguous; ambiguous timestamps fall back to
+    ``day_first``.
     
-    # Try each pattern until one works
-    for pattern in patterns:
-        dates = re.findall(pattern, data)
-        if dates:
-            messages = re.split(pattern, data)[1:]
-            pattern_used = pattern
+    Args:
+        timestamps (list): Timestamps captured by the tokenizer
+        sample_size (int): Number of evenly spaced timestamps to inspect
+        day_first (bool): Order assumed for ambiguous timestamps, day-first
+            being the most common WhatsApp layout; None returns None instead
+    
+    Returns:
+        str | None: Format usable with pd.to_datetime, or None if the
+        timestamps are not recognized
+    """
+    step = max(1, len(timestamps) // sample_size)
+    layout = None
+    first_max = second_max = 0
+    for sample in (timestamps[::step], timestamps if step > 1 else []):
+        for timestamp in sample:
+            match = TIMESTAMP_PATTERN.match(timestamp)
+            if match is None:
+                continue
+            layout = layout or match
+            first_max = max(first_max, int(match.group('first')))
+            second_max = max(second_max, int(match.group('second')))
+        if layout is None or first_max > 12 or second_max > 12:
             break
     
-    # If no pattern matched, return empty DataFrame
-    if not dates:
-        return pd.DataFrame()
+    if layout is None:
+        return None
+    
+    if second_max > 12 and first_max <= 12:
+        day_first = False
+    elif first_max > 12:
+        day_first = True
+    elif day_first is None:
+        return None
+    sep = layout.group('sep')
+    year = '%Y' if len(layout.group('year')) == 4 else '%y'
+    if day_first:
+        date_fmt = f'%d{sep}%m{sep}{year}'
+    else:
+        date_fmt = f'%m{sep}%d{sep}{year}'
+    
+    seconds = ':%S' if layout.group('seconds') else ''
+    if layout.group('meridiem'):
+        time_fmt = f"%I:%M{seconds}{layout.group('meridiem_sep')}%p"
+    else:
+        time_fmt = f'%H:%M{seconds}'
+    
+    return date_fmt + layout.group('joiner') + time_fmt
+
+
+def detect_encoding(sample):
+    """
+    Guess the encoding of an export from its first bytes
     
-    # Handle possible length mismatch
-    min_len = min(len(dates), len(messages))
-    dates, messages = dates[:min_len], messages[:min_len]
+    A byte order mark decides directly. Without one, UTF-16 is recognized by
+    the NUL bytes of its ASCII characters (dates and digits), which fill one
+    byte position far more than the other; anything else is read as UTF-8,
+    which is what WhatsApp writes.
     
-    df = pd.DataFrame({'user_message': messages, 'message_date': dates})
+    Args:
+        sample (bytes): Start of the export, e.g. ENCODING_SAMPLE_SIZE bytes
     
-    # Clean up and parse date column
-    df['message_date'] = df['message_date'].str.replace('\u202f', ' ')
+    Returns:
+        str: Codec name for codecs.getincrementaldecoder
+    """
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    even, odd = sample[0::2], sample[1::2]
+    if even and odd:
+        # Code units such as U+2600 or emoji surrogates put a few NULs on the
+        # other byte position too, so compare shares rather than require none
+        even_nuls, odd_nuls = even.count(0) / len(even), odd.count(0) / len(odd)
+        if odd_nuls > 0.25 and even_nuls < odd_nuls / 4:
+            return 'utf-16-le'
+        if even_nuls > 0.25 and odd_nuls < even_nuls / 4:
+            return 'utf-16-be'
+    return 'utf-8'
+
+
+def iter_text_chunks(source, chunk_size=CHUNK_SIZE, encoding=None, stats=None):
+    """
+    Read a chat export incrementally as decoded text chunks
     
-    # Try different date formats
-    date_formats = [
-        '%d/%m/%Y, %I:%M %p - ',
-        '%d/%m/%y, %I:%M %p - ',
-        '%m/%d/%Y, %I:%M %p - ',
-        '%m/%d/%y, %I:%M %p - ',
-        '%d/%m/%Y, %H:%M - ',
-        '%d/%m/%y, %H:%M - ',
-    ]
+    Binary input is decoded with an incremental decoder for ``encoding``,
+    detected from the first chunk when None (a leading byte order mark is
+    dropped). Undecodable bytes become U+FFFD instead of failing the parse.
     
-    for fmt in date_formats:
-        try:
-            df['message_date'] = pd.to_datetime(df['message_date'], format=fmt, errors='coerce')
-            if df['message_date'].notna().sum() > 0:
+    Args:
+        source: Text or binary file object, or a memory-mapped file
+        chunk_size (int): Number of characters/bytes read per chunk
+        encoding (str): Codec of binary input; detected when None
+        stats (dict): If given, receives 'encoding' (None for text input)
+            and 'replacements', the number of U+FFFD characters produced
+    
+    Yields:
+        str: Consecutive pieces of the export text
+    """
+    if stats is None:
+        stats = {}
+    stats.update(encoding=None, replacements=0)
+    decoder = None
+    while True:
+        chunk = source.read(chunk_size)
+        if not chunk:
+            break
+        if isinstance(chunk, str):
+            yield chunk
+            continue
+        if decoder is None:
+            stats['encoding'] = encoding or detect_encoding(chunk[:ENCODING_SAMPLE_SIZE])
+            decoder = codecs.getincrementaldecoder(stats['encoding'])(errors='replace')
+        # The incremental decoder holds back multi-byte sequences cut at the chunk edge
+        text = decoder.decode(chunk)
+        stats['replacements'] += text.count('\ufffd')
+        yield text
+    if decoder is not None:
+        tail = decoder.decode(b'', final=True)
+        stats['replacements'] += tail.count('\ufffd')
+        if tail:
+            yield tail
+
+
+def _last_header_start(buffer, tokenizer):
+    """
+    Find where the last complete message header in ``buffer`` starts
+    
+    Only headers on fully received lines are considered, so a header cut at
+    the chunk edge is never mistaken for message text.
+    
+    Returns:
+        int: Index of the line break preceding the header, or -1
+    """
+    end = buffer.rfind('\n')
+    while end > 0:
+        start = buffer.rfind('\n', 0, end)
+        if start < 0:
+            break
+        if tokenizer.match(buffer, start):
+            return start
+        end = start
+    return -1
+
+
+def iter_message_batches(chunks, header_format=None, batch_size=BATCH_SIZE, stats=None):
+    """
+    Tokenize streamed chat text into bounded-size message batches
+    
+    Text after the last complete header is carried over to the next chunk,
+    so messages spanning chunk boundaries and multi-line messages stay intact.
+    
+    Args:
+        chunks (iterable): Consecutive pieces of the export text
+        header_format (dict): Entry of HEADER_FORMATS; detected from the
+            first SAMPLE_SIZE characters when None
+        batch_size (int): Approximate number of messages per batch
+        stats (dict): If given, receives 'header_format', the name of the
+            format used (None until one is detected)
+    
+    Yields:
+        tuple: (timestamps, users, messages) lists as from tokenize_chat
+    """
+    if stats is None:
+        stats = {}
+    stats['header_format'] = header_format and header_format['name']
+    buffer = ''
+    batch = ([], [], [])
+    for chunk in chunks:
+        buffer += chunk
+        if header_format is None:
+            if len(buffer) < SAMPLE_SIZE:
+                continue
+            header_format = detect_header_format(buffer[:SAMPLE_SIZE])
+            if header_format is None:
+                return
+            stats['header_format'] = header_format['name']
+        tokenizer = get_tokenizer(header_format)
+        cut = _last_header_start(buffer, tokenizer)
+        if cut <= 0:
+            continue
+        for column, values in zip(batch, tokenize_chat(buffer[:cut], header_format)):
+            column.extend(values)
+        buffer = buffer[cut:]
+        if len(batch[0]) >= batch_size:
+            yield batch
+            batch = ([], [], [])
+    
+    if header_format is None:
+        header_format = detect_header_format(buffer[:SAMPLE_SIZE])
+        if header_format is None:
+            return
+        stats['header_format'] = header_format['name']
+    for column, values in zip(batch, tokenize_chat(buffer, header_format)):
+        column.extend(values)
+    if batch[0]:
+        yield batch
+
+
+def preprocess_whatsapp_chat(data, date_format=None, chunk_size=CHUNK_SIZE, batch_size=BATCH_SIZE,
+                             encoding=None):
+    """
+    Preprocess WhatsApp chat data and extract structured information
+    
+    The timestamp format is detected once from a sample and stored in
+    ``df.attrs['date_format']``; pass it back as ``date_format`` to parse
+    later exports of the same chat consistently. The name of the detected
+    header format is kept as ``df.attrs['header_format']``, and binary input
+    also records the detected ``encoding`` and the number of undecodable
+    bytes that were ``replacements`` in ``df.attrs``.
+    
+    Args:
+        data (str | file): Raw WhatsApp chat export text, or a text/binary
+            file object (including a memory-mapped file) that is read
+            incrementally in ``chunk_size`` pieces
+        date_format (str): strftime format of the header timestamps;
+            detected from the data when None
+        chunk_size (int): Read size used when streaming from a file
+        batch_size (int): Messages per DataFrame batch when streaming
+        encoding (str): Codec of binary input; detected when None
+    
+    Returns:
+        pd.DataFrame: Processed DataFrame with extracted features
+    """
+    decoding = {'encoding': None, 'replacements': 0}
+    detected = {'header_format': None}
+    if isinstance(data, str):
+        data = data[1:] if data.startswith('\ufeff') else data
+        header_format = detect_header_format(data[:SAMPLE_SIZE])
+        batches = [tokenize_chat(data, header_format)] if header_format else []
+        detected['header_format'] = header_format and header_format['name']
+    else:
+        chunks = iter_text_chunks(data, chunk_size, encoding, decoding)
+        batches = iter_message_batches(chunks, batch_size=batch_size, stats=detected)
+    
+    frames, held = [], []
+    for batch in batches:
+        if date_format is None:
+            if detect_date_format(batch[0]) is None:
                 break
-        except:
+            # Hold batches back until a field above 12 settles the day/month
+            # order, so the result does not depend on the batch size
+            held.append(batch)
+            date_format = detect_date_format(batch[0], day_first=None)
+            if date_format is None:
+                continue
+            # Later batches reuse the format settled here
+            frames.extend(build_chat_frame(*held_batch, date_format) for held_batch in held)
+            held = []
             continue
+        frames.append(build_chat_frame(*batch, date_format))
+    if held:
+        # Every date was ambiguous, so the day-first fallback is as good as any
+        date_format = detect_date_format(held[0][0])
+        frames.extend(build_chat_frame(*held_batch, date_format) for held_batch in held)
+    
+    # If no pattern matched, return empty DataFrame
+    if not frames:
+        return pd.DataFrame()
+    
+    if len(frames) == 1:
+        df = frames[0]
+    else:
+        df = pd.concat(frames, ignore_index=True)
+        # Batches carry different sender categories, which concat widens to strings
+        df['user'] = df['user'].astype('category')
+    df.attrs['date_format'] = date_format
+    df.attrs.update(detected)
+    df.attrs.update(decoding)
+    return df
+
+
+def preprocess_chat_file(path, **kwargs):
+    """
+    Preprocess a chat export on disk by streaming it through a memory map
+    
+    Args:
+        path (str): Path to the exported .txt file
+        **kwargs: Forwarded to preprocess_whatsapp_chat
+    
+    Returns:
+        pd.DataFrame: Processed DataFrame with extracted features
+    """
+    if os.path.getsize(path) == 0:
+        return pd.DataFrame()
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        return preprocess_whatsapp_chat(mapped, **kwargs)
+
+
+def starts_with_header(text):
+    """
+    Check whether ``text`` begins (after line breaks) with a message header
+    
+    Args:
+        text (str): Start of an export or of a newly appended tail
+    
+    Returns:
+        bool: True when the first line is a message header
+    """
+    return get_sampler().match('\n' + text.lstrip('\r\n')) is not None
+
+
+def append_chat_frames(base, tail):
+    """
+    Append messages parsed from the new tail of an export to a processed chat
+    
+    Args:
+        base (pd.DataFrame): Previously processed chat
+        tail (pd.DataFrame): Processed messages that follow it
+    
+    Returns:
+        pd.DataFrame: The combined chat, as parsing the whole export would give
+    """
+    if tail.empty:
+        return base
+    # Recode both parts onto one sorted set of senders so concat keeps the categorical
+    users = base['user'].cat.categories.union(tail['user'].cat.categories)
+    df = pd.concat([
+        base.assign(user=base['user'].cat.set_categories(users)),
+        tail.assign(user=tail['user'].cat.set_categories(users)),
+    ], ignore_index=True)
+    df.attrs['date_format'] = base.attrs.get('date_format') or tail.attrs.get('date_format')
+    df.attrs['header_format'] = base.attrs.get('header_format') or tail.attrs.get('header_format')
+    df.attrs['encoding'] = base.attrs.get('encoding')
+    df.attrs['replacements'] = base.attrs.get('replacements', 0) + tail.attrs.get('replacements', 0)
+    return df
+
+
+def parse_timestamps(timestamps, date_format):
+    """
+    Parse header timestamps with a known format in a single vectorized pass
+    
+    Uses Arrow's strptime kernel when pyarrow is installed, re-parsing any
+    rows it rejects (e.g. unusual whitespace) with pandas.
+    
+    Args:
+        timestamps (list): Timestamps captured by the tokenizer
+        date_format (str): strftime format from detect_date_format
     
-    df.rename(columns={'message_date': 'date'}, inplace=True)
+    Returns:
+        pd.Series: datetime64 values, NaT where parsing failed
+    """
+    if pc is None:
+        return pd.to_datetime(pd.Series(timestamps, dtype=object), format=date_format, errors='coerce')
+    
+    parsed = pc.strptime(
+        pa.array(timestamps, type=pa.string()), format=date_format, unit='us', error_is_null=True
+    ).to_pandas()
+    missing = parsed.isna()
+    if missing.any():
+        retry = pd.Series(timestamps, dtype=object)[missing]
+        parsed[missing] = pd.to_datetime(retry, format=date_format, errors='coerce')
+    return parsed
+
+
+def build_chat_frame(timestamps, users, messages, date_format):
+    """
+    Build the processed DataFrame from tokenized message columns
+    
+    Args:
+        timestamps (list): Header timestamps as captured by the tokenizer
+        users (list): Sender names
+        messages (list): Message texts
+        date_format (str): strftime format of the timestamps
+    
+    Returns:
+        pd.DataFrame: Processed DataFrame with extracted features
+    """
+    df = pd.DataFrame({
+        'date': parse_timestamps(timestamps, date_format),
+        # The sender repeats for every message, so store it as a categorical
+        'user': pd.Categorical(users),
+        'message': messages,
+    })
     
     # Drop rows where date parsing failed
     df = df.dropna(subset=['date'])
     
-    # Extract sender and clean message
-    users = []
-    messages_clean = []
-    
-    for message in df['user_message']:
-        # Split on first occurrence of colon
-        entry = re.split(r'([\w\W]+?):\s', message, maxsplit=1)
-        
-        if len(entry) >= 3:  # User message format
-            users.append(entry[1].strip())
-            messages_clean.append(entry[2].strip())
-        else:  # System/group notification
-            users.append('group_notification')
-            messages_clean.append(entry[0].strip())
-    
-    df['user'] = users
-    df['message'] = messages_clean
-    df.drop(columns=['user_message'], inplace=True)
-    
-    # Add time features
-    df['only_date'] = df['date'].dt.date
-    df['year'] = df['date'].dt.year
-    df['month_num'] = df['date'].dt.month
-    df['month'] = df['date'].dt.month_name()
-    df['day'] = df['date'].dt.day
-    df['day_name'] = df['date'].dt.day_name()
-    df['hour'] = df['date'].dt.hour
-    df['minute'] = df['date'].dt.minute
-    
-    # Create period feature (hourly intervals)
-    period = []
-    for hour in df['hour']:
-        if hour == 23:
-            period.append(f"{hour:02d}-00")
-        elif hour == 0:
-            period.append("00-01")
-        else:
-            period.append(f"{hour:02d}-{hour+1:02d}")
-    
-    df['period'] = period
+    return add_time_features(df)
+
+
+def add_time_features(df):
+    """
+    Add calendar and time-of-day feature columns derived from ``date``
     
-    # Additional features
-    df['day_of_week'] = df['date'].dt.dayofweek  # Monday=0, Sunday=6
-    df['is_weekend'] = df['day_of_week'].isin([5, 6])  # Saturday and Sunday
+    All features are computed column-wise; low-cardinality labels are stored
+    as ordered categoricals built from integer codes.
     
-    # Categorize time of day
-    def get_time_category(hour):
-        if 5 <= hour < 12:
-            return 'Morning'
-        elif 12 <= hour < 17:
-            return 'Afternoon'
-        elif 17 <= hour < 21:
-            return 'Evening'
-        else:
-            return 'Night'
+    Args:
+        df (pd.DataFrame): DataFrame with a parsed ``date`` column
     
-    df['time_of_day'] = df['hour'].apply(get_time_category)
+    Returns:
+        pd.DataFrame: The same DataFrame with feature columns added
+    """
+    dates = df['date'].dt
+    month_num = dates.month
+    day_of_week = dates.dayofweek  # Monday=0, Sunday=6
+    hour = dates.hour
+    
+    df['only_date'] = dates.normalize()
+    df['year'] = dates.year
+    df['month_num'] = month_num
+    df['month'] = pd.Categorical.from_codes(month_num.to_numpy() - 1, dtype=MONTH_DTYPE)
+    df['day'] = dates.day
+    df['day_name'] = pd.Categorical.from_codes(day_of_week.to_numpy(), dtype=DAY_DTYPE)
+    df['hour'] = hour
+    df['minute'] = dates.minute
+    
+    # Hourly interval labels such as "09-10", indexed directly by hour
+    df['period'] = pd.Categorical.from_codes(hour.to_numpy(), dtype=PERIOD_DTYPE)
     
-    # Clean any remaining NaN values
-    df = df.dropna()
+    # Additional features
+    df['day_of_week'] = day_of_week
+    df['is_weekend'] = day_of_week >= 5  # Saturday and Sunday
+    df['time_of_day'] = pd.Categorical.from_codes(
+        TIME_OF_DAY_BY_HOUR[hour.to_numpy()], dtype=TIME_OF_DAY_DTYPE
+    )
     
     return df
 
@@ -146,15 +718,8 @@ def validate_chat_format(data):
     if not data or len(data.strip()) == 0:
         return False, "The file is empty"
     
-    # Check for common WhatsApp patterns
-    patterns = [
-        r'\d{1,2}/\d{1,2}/\d{2,4},\s\d{1,2}:\d{2}',  # Date pattern
-        r':\s',  # Message separator
-    ]
-    
-    matches = sum(1 for pattern in patterns if re.search(pattern, data))
-    
-    if matches < 2:
+    # Check for a known message header format
+    if detect_header_format(data[:SAMPLE_SIZE]) is None:
         return False, "The file doesn't appear to be a valid WhatsApp chat export"
     
     return True, ""
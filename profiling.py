@@ -0,0 +1,191 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+import pandas as pd
+
+logger = logging.getLogger('chatsight.metrics')
+
+# When set, every stage record is appended to this file as one JSON line
+METRICS_FILE_ENV = 'CHATSIGHT_METRICS_FILE'
+
+# Records kept in memory per profiler; older ones are dropped
+MAX_RECORDS = 1000
+
+# tracemalloc is process-wide; sessions share it through a reference count
+_tracing_lock = threading.Lock()
+_tracing_users = 0
+
+
+def _start_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        if _tracing_users == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        _tracing_users += 1
+
+
+def _stop_tracing():
+    global _tracing_users
+    with _tracing_lock:
+        _tracing_users -= 1
+        if _tracing_users == 0 and tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+class Profiler:
+    """
+    Records wall time, rows processed and peak allocation of pipeline stages
+
+    Stages are timed with a context manager (``stage``), a direct call
+    (``call``) or a decorator (``wrap``). With ``trace_memory`` the peak
+    tracemalloc allocation above the stage's starting point is recorded as
+    well; nested stages each get their own peak. tracemalloc slows Python
+    code down noticeably and counts allocations from every thread, so it is
+    off by default.
+
+    Each finished stage is kept in ``records``, logged as JSON on the
+    ``chatsight.metrics`` logger and, if configured, appended to a JSON
+    lines file for monitoring.
+    """
+
+    def __init__(self, trace_memory=False, metrics_file=None, max_records=MAX_RECORDS):
+        self.trace_memory = trace_memory
+        self.metrics_file = metrics_file if metrics_file is not None else os.environ.get(METRICS_FILE_ENV)
+        self.records = deque(maxlen=max_records)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _memory_stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+
+    def _start_memory(self):
+        _start_tracing()
+        stack = self._memory_stack()
+        current, peak = tracemalloc.get_traced_memory()
+        # Fold the enclosing stage's peak so far in before resetting the shared peak
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        tracemalloc.reset_peak()
+        frame = {'base': current, 'peak': current}
+        stack.append(frame)
+        return frame
+
+    def _stop_memory(self, frame):
+        stack = self._memory_stack()
+        peak = max(frame['peak'], tracemalloc.get_traced_memory()[1])
+        stack.pop()
+        if stack:
+            stack[-1]['peak'] = max(stack[-1]['peak'], peak)
+        _stop_tracing()
+        return round((peak - frame['base']) / 1e6, 3)
+
+    @contextmanager
+    def stage(self, name, rows=None, **context):
+        """
+        Time the enclosed block as one stage
+
+        Args:
+            name (str): Stage name, e.g. 'helper.fetch_stats'
+            rows (int): Rows processed, if known up front
+            **context: Extra fields stored with the record (e.g. user)
+
+        Yields:
+            dict: The record, so the block can fill in ``rows`` or context
+        """
+        record = {'stage': name, 'rows': rows, **context}
+        frame = self._start_memory() if self.trace_memory else None
+        start = time.perf_counter()
+        try:
+            yield record
+        finally:
+            record['seconds'] = round(time.perf_counter() - start, 6)
+            record['peak_mb'] = self._stop_memory(frame) if frame is not None else None
+            record['time'] = time.time()
+            self._emit(record)
+
+    def call(self, name, func, *args, rows=None, context=None, **kwargs):
+        """
+        Call ``func(*args, **kwargs)`` as a stage and return its result
+
+        Args:
+            rows (int | callable): Rows processed, or a function of the
+                result returning them (e.g. ``len``)
+            context (dict): Extra fields stored with the record
+        """
+        with self.stage(name, None if callable(rows) else rows, **(context or {})) as record:
+            result = func(*args, **kwargs)
+            if callable(rows):
+                record['rows'] = rows(result)
+        return result
+
+    def wrap(self, func, name=None, rows=None):
+        """
+        Return ``func`` instrumented as a stage named ``name`` (default: its qualified name)
+        """
+        name = name or f"{func.__module__}.{func.__name__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            return self.call(name, func, *args, rows=rows, **kwargs)
+        return wrapper
+
+    def _emit(self, record):
+        with self._lock:
+            self.records.append(record)
+            line = json.dumps(record, default=str)
+            if self.metrics_file:
+                try:
+                    with open(self.metrics_file, 'a', encoding='utf-8') as f:
+                        f.write(line + '\n')
+                except OSError:
+                    logger.warning("Could not write metrics to %s", self.metrics_file)
+        logger.info(line)
+
+    def to_frame(self):
+        """
+        All kept records as a DataFrame, oldest first
+        """
+        with self._lock:
+            records = list(self.records)
+        return pd.DataFrame(records, columns=['stage', 'seconds', 'rows', 'peak_mb', 'time']
+                            + sorted({key for record in records for key in record}
+                                     - {'stage', 'seconds', 'rows', 'peak_mb', 'time'}))
+
+    def summary(self):
+        """
+        Per-stage totals: calls, total/mean/max seconds, rows and max peak MB
+
+        Returns:
+            pd.DataFrame: One row per stage, slowest first
+        """
+        df = self.to_frame()
+        if df.empty:
+            return pd.DataFrame(columns=['calls', 'total_s', 'mean_s', 'max_s', 'rows', 'peak_mb'])
+        summary = df.groupby('stage').agg(
+            calls=('seconds', 'size'),
+            total_s=('seconds', 'sum'),
+            mean_s=('seconds', 'mean'),
+            max_s=('seconds', 'max'),
+            rows=('rows', 'max'),
+            peak_mb=('peak_mb', 'max'),
+        )
+        return summary.sort_values('total_s', ascending=False)
+
+    def to_json(self):
+        """
+        Machine-readable export of every kept record
+        """
+        with self._lock:
+            return json.dumps(list(self.records), default=str, indent=2)
+
+    def clear(self):
+        with self._lock:
+            self.records.clear()
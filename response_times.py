@@ -0,0 +1,196 @@
+import weakref
+import numpy as np
+import pandas as pd
+from textstats import NOTIFICATION_USER
+
+# A message this long after the previous one starts a new conversation
+# session instead of counting as a reply
+SESSION_GAP = pd.Timedelta(hours=6)
+
+# Lower edges (in seconds) of the reply latency histogram buckets and their labels;
+# the last bucket runs up to the session gap
+HISTOGRAM_EDGES = [0, 60, 300, 900, 3600]
+HISTOGRAM_LABELS = ['< 1 min', '1-5 min', '5-15 min', '15-60 min', '1 h +']
+
+
+def _to_timedelta(seconds):
+    return pd.to_timedelta(np.round(seconds), unit='s')
+
+
+class ResponseTimes:
+    """
+    Reply latencies and conversation sessions of a chat from one vectorized pass
+
+    Messages are ordered by time (per chat, when the frame has a ``chat_id``
+    column) and compared with their predecessor: a gap longer than
+    ``session_gap`` (or a new chat) starts a session, and a change of sender
+    within a session is a reply whose latency is the time since the previous
+    message. Group notifications are left out. Everything is computed with
+    NumPy over the whole chat, so the cost grows linearly with its length.
+
+    Attributes:
+        replies (pd.DataFrame): One row per reply: user, replied_to and
+            seconds
+        sessions (pd.DataFrame): One row per session: start, end, messages
+            and starter
+    """
+
+    def __init__(self, replies, sessions):
+        self.replies = replies
+        self.sessions = sessions
+
+    @classmethod
+    def from_frame(cls, df, session_gap=SESSION_GAP):
+        """
+        Find the replies and sessions of a processed chat
+
+        Args:
+            df (pd.DataFrame): Output of preprocess_whatsapp_chat, or the
+                combined frame of a MultiChat
+            session_gap (pd.Timedelta): Silence that ends a session
+
+        Returns:
+            ResponseTimes: Replies and sessions of the chat
+        """
+        users = df['user'].cat.codes.to_numpy()
+        categories = df['user'].cat.categories
+        times = df['date'].to_numpy().astype('datetime64[ns]').astype(np.int64)
+        parts = df['chat_id'].cat.codes.to_numpy() if 'chat_id' in df.columns else None
+
+        keep = users != categories.get_loc(NOTIFICATION_USER) if NOTIFICATION_USER in categories else None
+        if keep is not None:
+            users, times = users[keep], times[keep]
+            parts = parts[keep] if parts is not None else None
+        # Exports are nearly always in time order already; only sort when they are not
+        if parts is not None:
+            if (np.diff(parts) < 0).any() or ((np.diff(times) < 0) & (np.diff(parts) == 0)).any():
+                order = np.lexsort((times, parts))
+                users, times, parts = users[order], times[order], parts[order]
+        elif (np.diff(times) < 0).any():
+            order = np.argsort(times, kind='stable')
+            users, times = users[order], times[order]
+
+        n = len(times)
+        if not n:
+            # Only group notifications: no replies and no sessions
+            return cls(
+                pd.DataFrame({
+                    'user': pd.Categorical([], categories),
+                    'replied_to': pd.Categorical([], categories),
+                    'seconds': np.array([], dtype=float),
+                }),
+                pd.DataFrame({
+                    'start': pd.to_datetime(np.array([], dtype='datetime64[ns]')),
+                    'end': pd.to_datetime(np.array([], dtype='datetime64[ns]')),
+                    'messages': np.array([], dtype=np.int64),
+                    'starter': pd.Categorical([], categories),
+                }),
+            )
+        gaps = np.diff(times)
+        new_session = np.ones(n, dtype=bool)
+        new_session[1:] = gaps > session_gap.value
+        if parts is not None:
+            new_session[1:] |= parts[1:] != parts[:-1]
+        is_reply = np.zeros(n, dtype=bool)
+        is_reply[1:] = users[1:] != users[:-1]
+        is_reply &= ~new_session
+
+        reply = np.flatnonzero(is_reply)
+        replies = pd.DataFrame({
+            'user': pd.Categorical.from_codes(users[reply], categories),
+            'replied_to': pd.Categorical.from_codes(users[reply - 1], categories),
+            'seconds': gaps[reply - 1] / 1e9,
+        })
+
+        starts = np.flatnonzero(new_session)
+        ends = np.append(starts[1:], n) - 1
+        sessions = pd.DataFrame({
+            'start': pd.to_datetime(times[starts]),
+            'end': pd.to_datetime(times[ends]),
+            'messages': ends - starts + 1,
+            'starter': pd.Categorical.from_codes(users[starts], categories),
+        })
+        return cls(replies, sessions)
+
+    def _replies_by(self, selected_user):
+        if selected_user == 'Overall':
+            return self.replies
+        return self.replies[self.replies['user'] == selected_user]
+
+    def stats(self, selected_user):
+        """
+        Reply count and median, 90th percentile and mean latency
+
+        Returns:
+            dict: replies, median, p90 and mean (Timedeltas), or None when
+            the selection never replied
+        """
+        seconds = self._replies_by(selected_user)['seconds'].to_numpy()
+        if not len(seconds):
+            return None
+        median, p90 = np.percentile(seconds, [50, 90])
+        return {
+            'replies': len(seconds),
+            'median': _to_timedelta(median),
+            'p90': _to_timedelta(p90),
+            'mean': _to_timedelta(seconds.mean()),
+        }
+
+    def _table(self, keys, replies=None):
+        replies = self.replies if replies is None else replies
+        grouped = replies.groupby(keys, observed=True)['seconds']
+        table = pd.DataFrame({
+            'replies': grouped.size(),
+            'median': _to_timedelta(grouped.median()),
+            'p90': _to_timedelta(grouped.quantile(0.9)),
+            'mean': _to_timedelta(grouped.mean()),
+        })
+        return table.sort_values('replies', ascending=False, kind='stable')
+
+    def per_user(self):
+        """
+        Latency distribution of every user's replies, most replies first
+        """
+        return self._table('user')
+
+    def per_pair(self, selected_user='Overall'):
+        """
+        Latency per (user, replied_to) pair, limited to the user's replies unless 'Overall'
+        """
+        return self._table(['user', 'replied_to'], self._replies_by(selected_user))
+
+    def histogram(self, selected_user):
+        """
+        Number of replies per latency bucket (HISTOGRAM_LABELS)
+        """
+        seconds = self._replies_by(selected_user)['seconds'].to_numpy()
+        buckets = np.searchsorted(HISTOGRAM_EDGES, seconds, side='right') - 1
+        counts = np.bincount(buckets, minlength=len(HISTOGRAM_EDGES))
+        return pd.Series(counts, index=pd.Index(HISTOGRAM_LABELS, name='latency'), name='replies')
+
+    def starters(self):
+        """
+        Sessions started per user, most first
+        """
+        starters = self.sessions['starter'].value_counts()
+        return starters[starters > 0].rename('sessions')
+
+
+_response_times = {}
+
+
+def get_response_times(df):
+    """
+    Return the ResponseTimes of a processed chat, computing them on first use
+
+    Results are cached per DataFrame object and released with it, like the
+    chat's aggregate index.
+    """
+    key = id(df)
+    entry = _response_times.get(key)
+    if entry is not None and entry[0]() is df:
+        return entry[1]
+    result = ResponseTimes.from_frame(df)
+    _response_times[key] = (weakref.ref(df), result)
+    weakref.finalize(df, _response_times.pop, key, None)
+    return result
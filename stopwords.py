@@ -0,0 +1,82 @@
+import os
+import threading
+
+# Directory holding the bundled stop-word lists
+STOP_WORDS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_LOCALE = 'hinglish'
+
+# Bundled lists, loaded once at import
+BUNDLED_LISTS = {
+    'hinglish': 'stop_hinglish.txt',
+}
+
+_registry = {}
+_lock = threading.Lock()
+
+
+def read_stop_words(path):
+    """
+    Read a stop-word file (one word per line, blank lines ignored)
+
+    Args:
+        path (str): Path to the list; relative paths resolve against the
+            directory of this module
+
+    Returns:
+        frozenset: Lowercased stop words, empty if the file is missing
+    """
+    if not os.path.isabs(path):
+        path = os.path.join(STOP_WORDS_DIR, path)
+    if not os.path.exists(path):
+        return frozenset()
+    with open(path, 'r', encoding='utf-8') as f:
+        return frozenset(line.strip().lower() for line in f if line.strip())
+
+
+def register_stop_words(locale, words=(), path=None):
+    """
+    Add stop words to a locale, creating the locale if needed
+
+    Words are merged into the existing set, so a custom list extends the
+    bundled one instead of replacing it.
+
+    Args:
+        locale (str): Name of the stop-word list, e.g. 'hinglish'
+        words (iterable): Extra words to add
+        path (str): Optional file with one word per line to add
+
+    Returns:
+        frozenset: The updated stop words for the locale
+    """
+    extra = {word.strip().lower() for word in words if word.strip()}
+    if path is not None:
+        extra |= read_stop_words(path)
+    with _lock:
+        _registry[locale] = _registry.get(locale, frozenset()) | extra
+        return _registry[locale]
+
+
+def get_stop_words(*locales):
+    """
+    Return the stop words for one or more locales as a hashed set
+
+    Args:
+        *locales (str): Registered locale names; DEFAULT_LOCALE when omitted
+
+    Returns:
+        frozenset: Union of the requested lists
+    """
+    if not locales:
+        locales = (DEFAULT_LOCALE,)
+    if len(locales) == 1:
+        return _registry.get(locales[0], frozenset())
+    return frozenset().union(*(_registry.get(locale, frozenset()) for locale in locales))
+
+
+def available_locales():
+    return sorted(_registry)
+
+
+for _locale, _path in BUNDLED_LISTS.items():
+    register_stop_words(_locale, path=_path)
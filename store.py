@@ -0,0 +1,308 @@
+import io
+import json
+import os
+import shutil
+import tempfile
+from aggregates import ChatIndex, get_chat_index, set_chat_index
+from cache import content_hash
+from preprocessor import preprocess_whatsapp_chat, starts_with_header, append_chat_frames
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = feather = None
+
+# Bumped whenever the stored layout, the derived columns or what the parser
+# recognizes change; older entries are then treated as missing and re-parsed
+STORE_VERSION = 3
+
+CHAT_FILE = 'chat.arrow'
+META_FILE = 'meta.json'
+INDEX_DIR = 'index'
+
+# Leading bytes fingerprinted per entry to find earlier exports of the same chat
+HEAD_BYTES = 4096
+
+
+def default_store_dir():
+    """
+    Store location from CHATSIGHT_STORE_DIR, else ~/.cache/chatsight
+    """
+    return os.environ.get('CHATSIGHT_STORE_DIR') or os.path.join(
+        os.path.expanduser('~'), '.cache', 'chatsight'
+    )
+
+
+def _read_arrow(path):
+    """
+    Memory-map an Arrow IPC file and convert it to pandas
+
+    Column buffers stay backed by the mapping, so processes loading the same
+    chat share the operating system's page cache instead of private copies.
+    """
+    with pa.memory_map(path) as source:
+        table = pa.ipc.open_file(source).read_all()
+    return table.to_pandas()
+
+
+def _write_arrow(df, path):
+    feather.write_feather(df, path, compression='uncompressed')
+
+
+class ChatStore:
+    """
+    On-disk store of processed chats keyed by the content hash of the export
+
+    Each entry is a directory holding the processed DataFrame as an
+    uncompressed Arrow IPC file, the ChatIndex tables next to it and a
+    small JSON metadata file (store version, date format, row count).
+    Entries are written to a temporary directory and renamed into place,
+    so concurrent Streamlit workers never see a half-written chat.
+
+    When the raw export is given, its size and a fingerprint of its first
+    bytes are recorded too, so a later, longer export of the same chat can be
+    recognized and only its new tail parsed (see ``extend``).
+
+    Like ParseCache, the store keeps to a byte budget: once its entries
+    exceed ``max_bytes`` on disk, the least recently used ones are deleted.
+    """
+
+    def __init__(self, root=None, max_bytes=2 * 1024 * 1024 * 1024):
+        if pa is None:
+            raise ImportError("ChatStore requires pyarrow")
+        self.root = root or default_store_dir()
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, key):
+        return os.path.join(self.root, key)
+
+    def __contains__(self, key):
+        return self._read_meta(key) is not None
+
+    def _read_meta(self, key):
+        try:
+            with open(os.path.join(self.path_for(key), META_FILE), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return meta if meta.get('version') == STORE_VERSION else None
+
+    def load(self, key):
+        """
+        Load a stored chat with its aggregate index already registered
+
+        Args:
+            key (str): Content hash of the export
+
+        Returns:
+            pd.DataFrame: The processed chat, or None if it is not stored
+        """
+        meta = self._read_meta(key)
+        if meta is None:
+            return None
+        entry = self.path_for(key)
+        try:
+            df = _read_arrow(os.path.join(entry, CHAT_FILE))
+            tables = {
+                name: _read_arrow(os.path.join(entry, INDEX_DIR, f'{name}.arrow'))
+                for name in meta['tables']
+            }
+        except (OSError, pa.ArrowInvalid):
+            return None
+        try:
+            # The directory's modification time is the entry's last use
+            os.utime(entry)
+        except OSError:
+            pass
+        df.attrs['date_format'] = meta.get('date_format')
+        df.attrs['header_format'] = meta.get('header_format')
+        df.attrs['encoding'] = meta.get('encoding')
+        df.attrs['replacements'] = meta.get('replacements', 0)
+        if tables:
+            set_chat_index(df, ChatIndex.from_tables(tables))
+        return df
+
+    def save(self, key, df, data=None):
+        """
+        Write a processed chat and its ChatIndex tables under ``key``
+
+        An entry that already exists (e.g. written by another worker) is kept.
+        Empty chats are not stored, so an export the parser failed on is
+        parsed again next time rather than failing from the store forever;
+        neither are chats larger than the whole budget. Older entries are
+        pruned afterwards to keep the store within ``max_bytes``.
+
+        Args:
+            key (str): Content hash of the export
+            df (pd.DataFrame): The processed chat
+            data (bytes | memoryview): The raw export, recorded so that later
+                exports extending it can be parsed incrementally
+        """
+        entry = self.path_for(key)
+        if df.empty or key in self:
+            return
+        tables = get_chat_index(df).to_tables()
+        staging = tempfile.mkdtemp(prefix=f'.{key}-', dir=self.root)
+        try:
+            _write_arrow(df, os.path.join(staging, CHAT_FILE))
+            os.makedirs(os.path.join(staging, INDEX_DIR))
+            for name, table in tables.items():
+                _write_arrow(table, os.path.join(staging, INDEX_DIR, f'{name}.arrow'))
+            nbytes = sum(
+                os.path.getsize(os.path.join(folder, name))
+                for folder, _, names in os.walk(staging) for name in names
+            )
+            if nbytes > self.max_bytes:
+                return
+            meta = {
+                'version': STORE_VERSION,
+                'nbytes': nbytes,
+                'date_format': df.attrs.get('date_format'),
+                'header_format': df.attrs.get('header_format'),
+                'encoding': df.attrs.get('encoding'),
+                'replacements': df.attrs.get('replacements', 0),
+                'rows': len(df),
+                'tables': sorted(tables),
+            }
+            if data is not None:
+                meta['bytes'] = len(data)
+                meta['head'] = content_hash(data[:HEAD_BYTES])
+            with open(os.path.join(staging, META_FILE), 'w', encoding='utf-8') as f:
+                json.dump(meta, f)
+            if os.path.isdir(entry):
+                # Stale entry from an older store version
+                shutil.rmtree(entry, ignore_errors=True)
+            try:
+                os.rename(staging, entry)
+            except OSError:
+                # Another process stored the same chat first
+                pass
+        finally:
+            if os.path.isdir(staging):
+                shutil.rmtree(staging, ignore_errors=True)
+        self.prune()
+
+    def prune(self):
+        """
+        Delete least recently used entries until the store fits in ``max_bytes``
+
+        Entries written by an older store version are deleted outright.
+        """
+        entries = []
+        for key in os.listdir(self.root):
+            if key.startswith('.'):
+                continue
+            meta = self._read_meta(key)
+            if meta is None:
+                self.remove(key)
+                continue
+            try:
+                last_used = os.stat(self.path_for(key)).st_mtime
+            except OSError:
+                continue
+            entries.append((last_used, key, meta.get('nbytes', 0)))
+        total = sum(nbytes for _, _, nbytes in entries)
+        for _, key, nbytes in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self.remove(key)
+            total -= nbytes
+
+    def find_base(self, data):
+        """
+        Find the longest stored export that ``data`` extends byte for byte
+
+        Candidates are narrowed by the fingerprint of their first bytes, then
+        tried from the largest down: the first whose full prefix hashes to
+        its key is the answer, so at most one prefix is hashed per match.
+
+        Args:
+            data (bytes | memoryview): Raw export
+
+        Returns:
+            tuple: (key, meta) of the stored export, or None
+        """
+        heads = {}
+        candidates = []
+        for key in os.listdir(self.root):
+            if key.startswith('.'):
+                continue
+            meta = self._read_meta(key)
+            if meta is None or 'bytes' not in meta or not 0 < meta['bytes'] < len(data):
+                continue
+            head_size = min(HEAD_BYTES, meta['bytes'])
+            if head_size not in heads:
+                heads[head_size] = content_hash(data[:head_size])
+            if heads[head_size] == meta['head']:
+                candidates.append((key, meta))
+        candidates.sort(key=lambda candidate: candidate[1]['bytes'], reverse=True)
+        for key, meta in candidates:
+            if content_hash(data[:meta['bytes']]) == key:
+                return key, meta
+        return None
+
+    def extend(self, key, data):
+        """
+        Build the chat for ``data`` from a stored earlier export of it
+
+        Only the bytes after the stored export are parsed, with its date
+        format; the new messages' aggregates are merged into the stored
+        index instead of recomputing it. The result is stored under ``key``
+        and replaces the earlier export's entry, so a chat exported every
+        week keeps a single copy in the store.
+
+        Args:
+            key (str): Content hash of ``data``
+            data (bytes | memoryview): Raw export
+
+        Returns:
+            pd.DataFrame: The processed chat, or None when no stored export
+            is a prefix of ``data``, the export is not UTF-8 or the new part
+            does not start at a message header
+        """
+        found = self.find_base(data)
+        if found is None:
+            return None
+        base_key, meta = found
+        # A tail cut from a UTF-16/32 export has no byte order mark to decode it by
+        if meta.get('encoding') not in (None, 'utf-8', 'utf-8-sig'):
+            return None
+        tail = data[meta['bytes']:]
+        if not starts_with_header(bytes(tail[:1024]).decode('utf-8', errors='ignore')):
+            return None
+        base = self.load(base_key)
+        if base is None or base.empty:
+            return None
+
+        new = preprocess_whatsapp_chat(io.BytesIO(tail), date_format=meta.get('date_format'), encoding='utf-8')
+        df = append_chat_frames(base, new)
+        if not new.empty:
+            set_chat_index(df, get_chat_index(base).merge(get_chat_index(new)))
+        self.save(key, df, data)
+        if key in self:
+            self.remove(base_key)
+        return df
+
+    def get_or_parse(self, key, parse, data=None):
+        """
+        Return the stored chat for ``key``, calling ``parse()`` and storing the result on a miss
+
+        When the raw export is given, a miss first tries to extend a stored
+        earlier export of the same chat.
+        """
+        df = self.load(key)
+        if df is None and data is not None:
+            df = self.extend(key, data)
+        if df is None:
+            df = parse()
+            self.save(key, df, data)
+        return df
+
+    def remove(self, key):
+        shutil.rmtree(self.path_for(key), ignore_errors=True)
+
+    def keys(self):
+        return sorted(name for name in os.listdir(self.root)
+                      if not name.startswith('.') and name in self)
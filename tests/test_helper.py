@@ -0,0 +1,11 @@
+from collections import Counter
+
+from helper import cloud_frequencies
+
+
+def test_cloud_frequencies_strip_punctuation_and_drop_links_and_emoji():
+    counts = Counter({
+        'ok!': 3, 'ok,': 2, 'ok.': 1, 'ok?': 1, "don't": 2, 'nice😀': 1,
+        'https://example.com/watch?v=abc123': 2, 'example.com': 1, '😀': 5, '2024': 3, 'a': 1,
+    })
+    assert cloud_frequencies(counts, frozenset()) == Counter({'ok': 7, "don't": 2, 'nice': 1})
@@ -0,0 +1,14 @@
+import pandas as pd
+import pytest
+
+from links import count_links, find_links
+
+
+@pytest.mark.parametrize('text, links', [
+    ('john.in@gmail.com', []),
+    ('mail a@b.com or see b.com', ['b.com']),
+    ('x.io a.b@c.org www.c.org', ['x.io', 'www.c.org']),
+])
+def test_fast_count_agrees_with_find_links(text, links):
+    assert find_links(text) == links
+    assert count_links(pd.Series([text, 'no links here'])).tolist() == [len(links), 0]
@@ -0,0 +1,45 @@
+import io
+
+import pytest
+
+from aggregates import get_chat_index
+from benchmarks.synthetic import FORMATS, generate_chat
+from preprocessor import preprocess_whatsapp_chat
+
+
+@pytest.mark.parametrize('preset', ['us_12h', 'ios_12h'])
+@pytest.mark.parametrize('batch_size', [50, 100, 1000])
+def test_streamed_month_first_export_matches_string_parse(preset, batch_size):
+    text = generate_chat(5000, **FORMATS[preset])
+    expected = preprocess_whatsapp_chat(text)
+    streamed = preprocess_whatsapp_chat(io.BytesIO(text.encode('utf-8')), chunk_size=4096,
+                                        batch_size=batch_size)
+    assert len(expected) == 5000
+    assert streamed.attrs['date_format'] == expected.attrs['date_format']
+    assert streamed['date'].equals(expected['date'])
+    assert streamed['message'].equals(expected['message'])
+
+
+@pytest.mark.parametrize('encoding', ['utf-16-le', 'utf-16-be'])
+def test_bomless_utf16_with_nul_byte_code_units(encoding):
+    # 😀 (surrogate DE00), ☀ and 一 each have a 0x00 byte on the "wrong" side
+    text = generate_chat(50).replace('\n', ' 😀☀一\n', 3)
+    expected = preprocess_whatsapp_chat(text)
+    decoded = preprocess_whatsapp_chat(io.BytesIO(text.encode(encoding)))
+    assert decoded.attrs['encoding'] == encoding
+    assert decoded.attrs['replacements'] == 0
+    assert decoded['message'].equals(expected['message'])
+
+
+def test_ios_media_placeholders_count_as_media():
+    text = generate_chat(2000, **FORMATS['ios_12h'])
+    df = preprocess_whatsapp_chat(io.BytesIO(text.encode('utf-8')), batch_size=500)
+    assert df.attrs['header_format'] == 'ios_12h'
+
+    media_lines = sum(line.split(': ', 1)[-1].startswith('\u200e') for line in text.splitlines())
+    stats = get_chat_index(df).fetch_stats('Overall')
+    assert media_lines > 0
+    assert stats[2] == media_lines
+
+    words = get_chat_index(df).text.word_counter('Overall')
+    assert not {'image', 'omitted', '\u200eimage', '<attached:'} & words.keys()
@@ -0,0 +1,187 @@
+from collections import Counter
+import pandas as pd
+from emojis import count_emojis
+from links import count_links
+from preprocessor import media_mask
+from stopwords import get_stop_words
+
+NOTIFICATION_USER = 'group_notification'
+
+
+class TextStats:
+    """
+    Per-user token, word, emoji and link counts from one pass over the messages
+
+    Each user's messages are joined once and tokenized once; word totals,
+    stop-word filtered word frequencies, emoji frequencies and link counts
+    are all derived from that single pass.
+
+    Attributes:
+        words (dict): Whitespace token count per user
+        links (dict): Number of URLs per user
+        word_counts (dict): Lowercased, stop-word filtered Counter per user,
+            excluding group notifications and the media placeholders of
+            the export's header format
+        emoji_counts (dict): Counter of full emoji sequences per user
+    """
+
+    def __init__(self, words, links, word_counts, emoji_counts):
+        self.words = words
+        self.links = links
+        self.word_counts = word_counts
+        self.emoji_counts = emoji_counts
+        self._overall = {}
+
+    @classmethod
+    def from_frame(cls, df, stop_words=None, link_mode='fast'):
+        """
+        Run the text-analysis pass over a processed chat
+
+        Args:
+            df (pd.DataFrame): Output of preprocess_whatsapp_chat
+            stop_words (frozenset): Words excluded from word frequencies;
+                the default locale from the stop-word registry when None
+            link_mode (str): 'fast' regex link counting, or 'accurate' to
+                use URLExtract
+
+        Returns:
+            TextStats: Counts for every user in the chat
+        """
+        if stop_words is None:
+            stop_words = get_stop_words()
+
+        link_counts = count_links(df['message'], link_mode).groupby(df['user'], observed=True).sum()
+        links = {user: int(count) for user, count in link_counts.items()}
+        
+        words, word_counts, emoji_counts = {}, {}, {}
+        columns = pd.DataFrame({'message': df['message'], 'media': media_mask(df)})
+        for user, group in columns.groupby(df['user'], observed=True):
+            messages = group['message']
+            text = '\n'.join(messages.tolist())
+            words[user] = len(text.split())
+
+            emoji_counts[user] = count_emojis(text)
+
+            if user == NOTIFICATION_USER:
+                continue
+            chat_text = '\n'.join(messages[~group['media']].tolist())
+            counts = Counter(chat_text.lower().split())
+            for word in stop_words & counts.keys():
+                del counts[word]
+            word_counts[user] = counts
+
+        return cls(words, links, word_counts, emoji_counts)
+
+    def _counter(self, counters, name, selected_user):
+        """
+        Return one user's Counter, or the (cached) sum over users for "Overall"
+        """
+        if selected_user != 'Overall':
+            return counters.get(selected_user, Counter())
+        if name not in self._overall:
+            total = Counter()
+            for counts in counters.values():
+                total.update(counts)
+            self._overall[name] = total
+        return self._overall[name]
+
+    def word_counter(self, selected_user):
+        return self._counter(self.word_counts, 'words', selected_user)
+
+    def emoji_counter(self, selected_user):
+        return self._counter(self.emoji_counts, 'emojis', selected_user)
+
+    def merge(self, other):
+        """
+        Add the counts of messages that follow this chat
+
+        Each user's counters keep their first-seen order, with words new in
+        ``other`` appended, exactly as a single pass over both would build them.
+
+        Args:
+            other (TextStats): Counts for the appended messages
+
+        Returns:
+            TextStats: Counts for the combined chat
+        """
+        return TextStats.combine([self, other])
+
+    @classmethod
+    def combine(cls, parts):
+        """
+        Add up the counts of several chats (or parts of one), in the given order
+
+        Args:
+            parts (list): TextStats objects
+
+        Returns:
+            TextStats: Counts for all of their messages together
+        """
+        users = sorted(set().union(*(part.words for part in parts)))
+
+        def add(name):
+            return {user: sum(getattr(part, name).get(user, 0) for part in parts) for user in users}
+
+        def add_counters(name):
+            merged = {}
+            for user in users:
+                counters = [getattr(part, name)[user] for part in parts if user in getattr(part, name)]
+                if counters:
+                    counts = Counter(counters[0])
+                    for other in counters[1:]:
+                        counts.update(other)
+                    merged[user] = counts
+            return merged
+
+        return cls(add('words'), add('links'), add_counters('word_counts'), add_counters('emoji_counts'))
+
+    def to_tables(self):
+        """
+        Flatten the per-user counts into long DataFrames for storage
+
+        Rows keep each Counter's insertion order, so a reloaded instance
+        ranks ties in most_common() exactly like the original.
+        """
+        users = list(self.words)
+        return {
+            'text_totals': pd.DataFrame({
+                'user': users,
+                'words': [self.words[user] for user in users],
+                'links': [self.links.get(user, 0) for user in users],
+            }).astype({'words': 'int64', 'links': 'int64'}),
+            'word_counts': _counts_table(self.word_counts, 'word'),
+            'emoji_counts': _counts_table(self.emoji_counts, 'emoji'),
+        }
+
+    @classmethod
+    def from_tables(cls, tables):
+        """
+        Rebuild a TextStats from the output of to_tables
+        """
+        totals = tables['text_totals']
+        users = totals['user'].tolist()
+        words = dict(zip(users, totals['words'].tolist()))
+        links = dict(zip(users, totals['links'].tolist()))
+        return cls(
+            words, links,
+            _counters_from_table(tables['word_counts'], 'word'),
+            _counters_from_table(tables['emoji_counts'], 'emoji'),
+        )
+
+
+def _counts_table(counters, column):
+    users, keys, counts = [], [], []
+    for user, counter in counters.items():
+        users.extend([user] * len(counter))
+        keys.extend(counter.keys())
+        counts.extend(counter.values())
+    return pd.DataFrame({'user': users, column: keys, 'count': counts}).astype({
+        'user': str, column: str, 'count': 'int64'
+    })
+
+
+def _counters_from_table(table, column):
+    return {
+        user: Counter(dict(zip(group[column].tolist(), group['count'].tolist())))
+        for user, group in table.groupby('user', sort=False)
+    }
@@ -0,0 +1,156 @@
+import numpy as np
+
+# Daily timelines longer than this are down-sampled before they are charted
+MAX_POINTS = 1500
+
+# Bucket sizes tried from finest to coarsest: pandas offset alias and label
+RESOLUTIONS = [('D', 'daily'), ('W-MON', 'weekly'), ('MS', 'monthly')]
+
+# Plot width the timeline is fitted to, and the horizontal room each point needs
+DEFAULT_WIDTH_PX = 700
+PX_PER_POINT = 4
+
+
+def lttb_indices(x, y, threshold):
+    """
+    Pick ``threshold`` points of a series with Largest-Triangle-Three-Buckets
+
+    The first and last points are kept; every bucket in between keeps the
+    point forming the largest triangle with the previously kept point and
+    the mean of the next bucket, which preserves peaks and dips that plain
+    striding would drop.
+
+    Args:
+        x (array-like): Increasing x values (numbers or datetime64)
+        y (array-like): Values to preserve the shape of
+        threshold (int): Number of points to keep
+
+    Returns:
+        np.ndarray: Sorted positions of the kept points
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+    x = np.asarray(x)
+    if np.issubdtype(x.dtype, np.datetime64):
+        x = x.astype('datetime64[s]').astype(np.int64)
+    x = x.astype(float)
+    y = np.asarray(y, dtype=float)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    # Mean of every bucket up front; bucket i is anchored on bucket i + 1's mean
+    # and the last one on the final point
+    sizes = np.diff(np.append(edges, n - 1))
+    mean_x = np.append(np.add.reduceat(x[1:n - 1], edges[:-1] - 1) / sizes[:-1], x[-1])
+    mean_y = np.append(np.add.reduceat(y[1:n - 1], edges[:-1] - 1) / sizes[:-1], y[-1])
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+        next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        areas = np.abs(
+            (x[previous] - next_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (next_y - y[previous])
+        )
+        previous = start + int(areas.argmax())
+        selected[bucket + 1] = previous
+    return selected
+
+
+def downsample_timeline(timeline, x='only_date', y='message', max_points=MAX_POINTS):
+    """
+    Reduce a timeline DataFrame to at most ``max_points`` rows with LTTB
+
+    Args:
+        timeline (pd.DataFrame): e.g. the output of daily_timeline
+        x (str): Column with the (sorted) dates
+        y (str): Column with the counts
+        max_points (int): Rows to keep
+
+    Returns:
+        pd.DataFrame: ``timeline`` itself when short enough, else the kept rows
+    """
+    if len(timeline) <= max_points:
+        return timeline
+    return timeline.iloc[lttb_indices(timeline[x].to_numpy(), timeline[y].to_numpy(), max_points)]
+
+
+def choose_resolution(start, end, width_px=DEFAULT_WIDTH_PX, px_per_point=PX_PER_POINT):
+    """
+    Pick the finest bucketing whose point count fits the plot width
+
+    Args:
+        start (pd.Timestamp): First date of the timeline
+        end (pd.Timestamp): Last date of the timeline
+        width_px (int): Plot width in pixels
+        px_per_point (int): Pixels each point should get
+
+    Returns:
+        tuple: (pandas offset alias, label, number of buckets); monthly when
+        even months do not fit
+    """
+    max_points = max(2, width_px // px_per_point)
+    days = (end - start).days + 1
+    buckets = {
+        'D': days,
+        'W-MON': (end - start).days // 7 + 2,
+        'MS': (end.year - start.year) * 12 + end.month - start.month + 1,
+    }
+    for rule, label in RESOLUTIONS:
+        if buckets[rule] <= max_points:
+            return rule, label, buckets[rule]
+    rule, label = RESOLUTIONS[-1]
+    return rule, label, buckets[rule]
+
+
+def resample_timeline(daily, rule):
+    """
+    Sum a daily timeline into weekly or monthly buckets
+
+    Args:
+        daily (pd.DataFrame): Output of daily_timeline (only_date, message)
+        rule (str): Offset alias from RESOLUTIONS
+
+    Returns:
+        pd.DataFrame: Same columns, one row per bucket labelled by its
+        first day; empty buckets count 0
+    """
+    if rule == 'D':
+        return daily
+    counts = daily.set_index('only_date')['message'].resample(rule, label='left', closed='left').sum()
+    return counts.rename('message').reset_index()
+
+
+def adaptive_timeline(daily, width_px=DEFAULT_WIDTH_PX, px_per_point=PX_PER_POINT, rule=None):
+    """
+    Fit a daily timeline to a plot width
+
+    Resamples to weeks or months when days would be too dense, and
+    down-samples with LTTB if the chosen buckets still exceed the width
+    (or MAX_POINTS when ``rule`` is given).
+
+    Args:
+        daily (pd.DataFrame): Output of daily_timeline (only_date, message)
+        width_px (int): Plot width in pixels
+        px_per_point (int): Pixels each point should get
+        rule (str): Offset alias from RESOLUTIONS to force instead of
+            choosing one from the date range
+
+    Returns:
+        tuple: (timeline DataFrame with only_date and message, resolution
+        label such as 'weekly')
+    """
+    labels = dict(RESOLUTIONS)
+    if len(daily) < 2:
+        return daily, labels[rule or 'D']
+    if rule is None:
+        start, end = daily['only_date'].iloc[0], daily['only_date'].iloc[-1]
+        rule, label, _ = choose_resolution(start, end, width_px, px_per_point)
+        max_points = max(3, width_px // px_per_point)
+    else:
+        # An explicit resolution asks for detail, so only cap it at MAX_POINTS
+        label, max_points = labels[rule], MAX_POINTS
+    timeline = resample_timeline(daily, rule)
+    return downsample_timeline(timeline, max_points=max_points), label